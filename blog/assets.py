@@ -0,0 +1,80 @@
+from django.contrib.staticfiles import finders
+from django.core.checks import Error, Tags, Warning, register
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+import base64
+import functools
+import hashlib
+
+# Third-party assets pinned with their Subresource Integrity hash. `manage.py vendor_assets` downloads them
+# into blog/static/blog/vendor, from where they are served with the site's own static files; until then pages
+# load them from the CDN.
+VENDOR_ASSETS = {
+    'bootstrap.css': (
+        'blog/vendor/bootstrap-4.0.0/bootstrap.min.css',
+        'https://maxcdn.bootstrapcdn.com/bootstrap/4.0.0/css/bootstrap.min.css',
+        'sha384-Gn5384xqQ1aoWXA+058RXPxPg6fy4IWvTNh0E263XmFcJlSAwiGgFAW/dAiS6JXm',
+    ),
+    'jquery.js': (
+        'blog/vendor/jquery-3.2.1/jquery.slim.min.js',
+        'https://code.jquery.com/jquery-3.2.1.slim.min.js',
+        'sha384-KJ3o2DKtIkvYIK3UENzmM7KCkRr/rE9/Qpg6aAZGJwFDMVNA/GpGFF93hXpG5KkN',
+    ),
+    'popper.js': (
+        'blog/vendor/popper-1.12.9/popper.min.js',
+        'https://cdnjs.cloudflare.com/ajax/libs/popper.js/1.12.9/umd/popper.min.js',
+        'sha384-ApNbgh9B+Y1QKtv3Rn7W3mgPxhU9K/ScQsAP7hUibX39j7fakFPskvXusvfa0b4Q',
+    ),
+    'bootstrap.js': (
+        'blog/vendor/bootstrap-4.0.0/bootstrap.min.js',
+        'https://maxcdn.bootstrapcdn.com/bootstrap/4.0.0/js/bootstrap.min.js',
+        'sha384-JZR6Spejh4U02d8jOt6vLEHfe/JQGiRRSQQxSfFWpi1MquVdAyjUar5+76PVCmYl',
+    ),
+}
+
+def integrity(content, algorithm='sha384'):
+    """ Subresource Integrity hash of content, like the ones of VENDOR_ASSETS """
+    return f'{algorithm}-{base64.b64encode(hashlib.new(algorithm, content).digest()).decode()}'
+
+@functools.lru_cache(maxsize=None)
+def is_vendored(path):
+    return finders.find(path) is not None
+
+@receiver(setting_changed)
+def clear_vendored(setting, **kwargs):
+    if setting in ('STATICFILES_DIRS', 'STATICFILES_FINDERS'):
+        is_vendored.cache_clear()
+
+def asset_tag(name):
+    """
+    <link> or <script> tag of a VENDOR_ASSETS entry, pointing at the vendored copy, or at the pinned CDN URL
+    while the asset is not in the tree, so that no page ever references a static file that does not exist
+    """
+    path, cdn_url, sri = VENDOR_ASSETS[name]
+    if is_vendored(path):
+        # the integrity hash guards against a compromised CDN, and would break on CSS rewritten by collectstatic
+        url, attrs = static(path), ''
+    else:
+        url, attrs = cdn_url, format_html(' integrity="{}" crossorigin="anonymous"', sri)
+    if name.endswith('.css'):
+        return format_html('<link rel="stylesheet" href="{}"{}>', url, attrs)
+    return format_html('<script src="{}"{}></script>', url, attrs)
+
+@register(Tags.staticfiles)
+def check_vendor_assets(app_configs, **kwargs):
+    """ Every `manage.py check` reports assets still loaded from a CDN, and vendored copies that were altered """
+    errors = []
+    for name, (path, cdn_url, expected) in VENDOR_ASSETS.items():
+        found = finders.find(path)
+        if found is None:
+            errors.append(Warning(f'Vendored asset {name} ({path}) is missing, pages load it from {cdn_url}.',
+                hint='Run `manage.py vendor_assets` and commit blog/static/blog/vendor.', id='blog.W001'))
+            continue
+        with open(found, 'rb') as file:
+            if integrity(file.read(), expected.split('-', 1)[0]) != expected:
+                errors.append(Error(f'Vendored asset {name} ({found}) does not match its integrity hash.',
+                    hint='Run `manage.py vendor_assets --force`.', id='blog.E002'))
+    return errors
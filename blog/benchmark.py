@@ -0,0 +1,178 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+import datetime
+import http.cookiejar
+import re
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from user.models import Profile
+from .importer import PostImporter
+from .models import Post
+from .views import PostListView
+
+USERNAME = 'benchmark{}'
+PASSWORD = 'benchmark-password'
+POST_TITLE = 'Benchmark post {}'
+POST_PARAGRAPH = ('Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut '
+    'labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut '
+    'aliquip ex ea commodo consequat.')
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+def seed(users, posts, batch_size=1000):
+    """
+    Creates benchmark users, their profiles and posts spread over them, one post per minute back from
+    now. Rows that already exist are kept, so seeding the same database twice only adds what is missing.
+    Returns the usernames.
+    """
+    usernames = [USERNAME.format(i) for i in range(users)]
+    # hashing is deliberately slow, so every user shares one hash
+    password = make_password(PASSWORD)
+    User.objects.bulk_create([User(username=username, email=f'{username}@example.com', password=password)
+        for username in usernames], batch_size=batch_size, ignore_conflicts=True)
+    # bulk_create skips the post_save receiver creating profiles
+    user_ids = User.objects.filter(username__in=usernames).values_list('id', flat=True)
+    Profile.objects.bulk_create([Profile(user_id=user_id) for user_id in user_ids], batch_size=batch_size,
+        ignore_conflicts=True)
+
+    now = timezone.now()
+    rows = ({
+        'title': POST_TITLE.format(i),
+        'content': '\n\n'.join([POST_PARAGRAPH] * (1 + i % 5)),
+        'author': usernames[i % users],
+        'date_posted': (now - datetime.timedelta(minutes=i)).isoformat(),
+    } for i in range(posts))
+    for _ in PostImporter(batch_size=batch_size).run(rows):
+        pass
+    return usernames
+
+def percentile(values, p):
+    """ Nearest rank percentile of sorted values """
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def summarize(samples, elapsed):
+    """ Report of one scenario from its (status, seconds, queries) samples """
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    queries = [count for _, _, count in samples if count is not None]
+    statuses = {}
+    for status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'statuses': statuses,
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'mean_ms': round(statistics.mean(latencies), 2),
+        'queries_mean': round(statistics.mean(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else None,
+    }
+
+def server_timing_queries(value):
+    """ Query count reported by my_blog.metrics in a Server-Timing header, None without one """
+    match = SERVER_TIMING_QUERIES.search(value or '')
+    return int(match.group(1)) if match else None
+
+class ClientDriver:
+    """
+    Requests served in process by django.test.Client. Unless page_cache is set, a session cookie keeps
+    the anonymous page cache from answering, so pages are measured as they render.
+    """
+    def __init__(self, page_cache=False):
+        self.client = Client()
+        if not page_cache:
+            self.client.cookies[settings.SESSION_COOKIE_NAME] = 'benchmark'
+
+    def request(self, method, path, data=None):
+        started = time.perf_counter()
+        response = self.client.generic(method, path, urllib.parse.urlencode(data or {}),
+            'application/x-www-form-urlencoded')
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, server_timing_queries(response.get('Server-Timing'))
+
+    def login(self, username, password):
+        self.client.login(username=username, password=password)
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class HttpDriver:
+    """ Requests sent to a running server at base_url, with their own cookies, see ClientDriver for page_cache """
+    def __init__(self, base_url, page_cache=False):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect)
+        self.page_cache = page_cache
+
+    def request(self, method, path, data=None):
+        url = self.base_url + path
+        body = None
+        if data is not None:
+            if self.csrf_token() is None:
+                # forms set the CSRF cookie their POST must echo, fetching it is not part of the timing
+                self.request('GET', path)
+            body = urllib.parse.urlencode({**data, 'csrfmiddlewaretoken': self.csrf_token() or ''}).encode()
+        headers = {'Referer': url}
+        if not self.page_cache and not self.cookies:
+            # a cookie jar holding the server's cookies, such as a login's session, would be overridden
+            headers['Cookie'] = f'{settings.SESSION_COOKIE_NAME}=benchmark'
+        started = time.perf_counter()
+        try:
+            with self.opener.open(urllib.request.Request(url, body, headers, method=method)) as response:
+                response.read()
+                status, server_timing = response.status, response.headers.get('Server-Timing')
+        except urllib.error.HTTPError as error:
+            status, server_timing = error.code, error.headers.get('Server-Timing')
+        elapsed = time.perf_counter() - started
+        return status, elapsed, server_timing_queries(server_timing)
+
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == settings.CSRF_COOKIE_NAME), None)
+
+    def login(self, username, password):
+        self.request('POST', reverse('user-login'), {'username': username, 'password': password})
+
+def scenarios(usernames):
+    """ (name, method, paths, data, logged in) of every benchmarked page """
+    per_page = PostListView.paginate_by
+    deep_page = max(1, (Post.objects.count() + per_page - 1) // per_page)
+    slugs = list(Post.objects.order_by('-date_posted').values_list('slug', flat=True)[:100])
+    login = {'username': usernames[0], 'password': PASSWORD}
+    return [
+        ('blog-home', 'GET', [reverse('blog-home')], None, False),
+        ('blog-home-deep', 'GET', [f'{reverse("blog-home")}?page={deep_page}'], None, False),
+        ('blog-user_posts', 'GET', [reverse('blog-user_posts', args=[username]) for username in usernames[:20]],
+            None, False),
+        ('blog-post_detail', 'GET', [reverse('blog-post_detail', args=[slug]) for slug in slugs], None, False),
+        ('user-profile', 'GET', [reverse('user-profile')], None, True),
+        ('user-login', 'POST', [reverse('user-login')], login, False),
+    ]
+
+def run(new_driver, usernames, requests, warmup=5):
+    """
+    Runs every scenario sequentially with drivers made by new_driver(), returns their reports by name.
+    Logins get a fresh driver for every request, so each one really authenticates.
+    """
+    report = {}
+    for name, method, paths, data, logged_in in scenarios(usernames):
+        driver = new_driver()
+        if logged_in:
+            driver.login(usernames[0], PASSWORD)
+        for i in range(warmup):
+            (new_driver() if data else driver).request(method, paths[i % len(paths)], data)
+
+        samples = []
+        started = time.perf_counter()
+        for i in range(requests):
+            samples.append((new_driver() if data else driver).request(method, paths[i % len(paths)], data))
+        report[name] = summarize(samples, time.perf_counter() - started)
+    return report
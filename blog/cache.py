@@ -0,0 +1,45 @@
+import uuid
+
+from django.core.cache import cache
+
+FEED_VERSION_KEY = 'blog:feed:version:{}'
+POSTS_VERSION_KEY = 'blog:posts:version:{}'
+PAGES_VERSION_KEY = 'blog:pages:version'
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+def _bump_version(key):
+    # a fresh random token rather than an increment, so an evicted key can never bring back old entries
+    cache.set(key, uuid.uuid4().hex, None)
+
+def _scope(author_id):
+    return 'home' if author_id is None else author_id
+
+def feed_version(author_id=None):
+    """
+    Current version token of the home feed, or of the given author's feed. Fragments are cached
+    under keys containing the token, so bumping it invalidates them without a global flush.
+    """
+    return _get_version(FEED_VERSION_KEY.format(_scope(author_id)))
+
+def bump_feed_version(author_id=None):
+    _bump_version(FEED_VERSION_KEY.format(_scope(author_id)))
+
+def posts_version(author_id=None):
+    """ Like feed_version(), but only changes with the posts themselves and not with author avatars """
+    return _get_version(POSTS_VERSION_KEY.format(_scope(author_id)))
+
+def bump_posts_version(author_id=None):
+    _bump_version(POSTS_VERSION_KEY.format(_scope(author_id)))
+
+def pages_version():
+    """ Version token of every page in the anonymous page cache, see blog/middleware.py """
+    return _get_version(PAGES_VERSION_KEY)
+
+def bump_pages_version():
+    _bump_version(PAGES_VERSION_KEY)
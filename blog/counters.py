@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+import collections
+import logging
+import threading
+import time
+
+from .models import Post, PostViewCount
+
+logger = logging.getLogger(__name__)
+
+class ViewCounter:
+    """
+    Counts post views in process memory and adds them to PostViewCount in one batch, once
+    settings.BLOG_VIEW_COUNT_FLUSH_INTERVAL seconds have passed since the last flush or when more than
+    BLOG_VIEW_COUNT_MAX_PENDING posts have pending views. The number of writes per process therefore
+    depends on time and on how many different posts are read, never on how often they are read.
+    Flushes add to the stored counts with a single UPDATE, so any number of processes can flush
+    concurrently. Views still pending when a process exits are lost.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = collections.Counter()
+        self._last_flush = time.monotonic()
+
+    def record(self, slug):
+        with self._lock:
+            self._pending[slug] += 1
+            due = (len(self._pending) > settings.BLOG_VIEW_COUNT_MAX_PENDING
+                or time.monotonic() - self._last_flush >= settings.BLOG_VIEW_COUNT_FLUSH_INTERVAL)
+            if due:
+                pending = self._take_pending()
+        if due:
+            self._write(pending)
+
+    def flush(self):
+        """ Writes pending views now, returns the number of posts updated """
+        with self._lock:
+            pending = self._take_pending()
+        return self._write(pending)
+
+    def pending(self):
+        with self._lock:
+            return collections.Counter(self._pending)
+
+    def _take_pending(self):
+        pending, self._pending = self._pending, collections.Counter()
+        self._last_flush = time.monotonic()
+        return pending
+
+    def _write(self, pending):
+        if not pending:
+            return 0
+        try:
+            # posts are counted by slug since that is all a URL carries
+            post_ids = dict(Post.objects.filter(slug__in=pending).values_list('slug', 'id'))
+            views = {post_ids[slug]: count for slug, count in pending.items() if slug in post_ids}
+            if not views:
+                return 0
+            with transaction.atomic():
+                PostViewCount.objects.bulk_create([PostViewCount(post_id=pk) for pk in views], ignore_conflicts=True)
+                PostViewCount.objects.filter(pk__in=views).update(count=F('count') + Case(
+                    *[When(pk=pk, then=Value(count)) for pk, count in views.items()], output_field=IntegerField()))
+            return len(views)
+        except Exception:
+            # keep the views for the next flush rather than failing the request that triggered this one
+            logger.exception('Could not write view counts of %d post(s)', len(pending))
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+
+post_views = ViewCounter()
@@ -0,0 +1,52 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+import datetime
+
+from .models import Post
+
+EXPORT_FIELDS = ('id', 'title', 'slug', 'content', 'date_posted', 'updated_at')
+CHUNK_SIZE = 2000
+
+def parse_timestamp(value):
+    """ ISO 8601 date or datetime as an aware datetime, naive values are in the current time zone """
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f'{value!r} is not an ISO 8601 date or datetime')
+        since = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+def export_rows(since=None, chunk_size=CHUNK_SIZE):
+    """
+    Posts as plain dicts with the author's username, oldest update first, optionally only those updated
+    at or after since. Rows are read chunk_size at a time with no model instances, so memory stays flat.
+    """
+    posts = Post.objects.all()
+    if since is not None:
+        posts = posts.filter(updated_at__gte=since)
+    rows = posts.order_by('updated_at', 'id').values_list(*EXPORT_FIELDS, 'author__username')
+    keys = EXPORT_FIELDS + ('author',)
+    return (dict(zip(keys, row)) for row in rows.iterator(chunk_size=chunk_size))
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+def json_array_chunks(rows):
+    """ A single JSON array, emitted one element at a time """
+    encoder = DjangoJSONEncoder()
+    yield '['
+    for i, row in enumerate(rows):
+        yield (',\n' if i else '\n') + encoder.encode(row)
+    yield '\n]\n'
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+    'json': ('application/json', json_array_chunks),
+}
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.feedgenerator import Atom1Feed
+
+from .cache import posts_version
+from .models import Post
+
+import hashlib
+
+class LatestPostsFeed(Feed):
+    title = 'My blog'
+    link = reverse_lazy('blog-home')
+    description = 'Latest posts on My blog'
+    items_count = 20
+
+    def get_posts(self):
+        return Post.objects.select_related('author').defer('content', 'content_html').order_by('-date_posted')
+
+    def items(self):
+        return self.get_posts()[:self.items_count]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_pubdate(self, item):
+        return item.date_posted
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+class UserPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'My blog - {obj.username}'
+
+    def link(self, obj):
+        return reverse('blog-user_posts', args=[obj.username])
+
+    def description(self, obj):
+        return f'Latest posts by {obj.username} on My blog'
+
+    def items(self, obj):
+        return self.get_posts().filter(author=obj)[:self.items_count]
+
+class UserPostsAtomFeed(UserPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+def cached_feed(feed_class):
+    """
+    View serving feed_class's XML from cache until a post changes. Repeated polls are answered with 304
+    from the cached ETag, so they cost one cache read and, for author feeds, one user lookup. There is no
+    Last-Modified: the feed's latest update stays the same when an older post is deleted.
+    """
+    feed = feed_class()
+
+    def view(request, username=None):
+        author_id = None
+        if username is not None:
+            author_id = get_object_or_404(User.objects.only('id'), username=username).pk
+        key = 'blog:feed_xml:{}:{}:{}:{}:{}'.format(feed_class.__name__, author_id, request.get_host(),
+            request.scheme, posts_version(author_id))
+        entry = cache.get(key)
+        if entry is None:
+            response = feed(request, **({'username': username} if username is not None else {}))
+            entry = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+            }
+            cache.set(key, entry, settings.BLOG_FEED_CACHE_TIMEOUT)
+
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        response['ETag'] = etag
+        return response
+
+    view.feed_class = feed_class
+    return view
@@ -0,0 +1,166 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+import csv
+import itertools
+import json
+
+from .cache import bump_feed_version, bump_posts_version, bump_pages_version
+from .export import parse_timestamp
+from .models import Post, free_slug, slug_from_title
+from .search import get_search_backend
+from .stats import record_posts
+
+BATCH_SIZE = 1000
+TITLE_MAX_LENGTH = Post._meta.get_field('title').max_length
+
+def read_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+def read_json_array(file, read_size=1 << 16):
+    """ Elements of a top-level JSON array, decoded one at a time instead of loading the whole document """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = file.read(read_size)
+        buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return ''
+            read_more()
+
+    if next_char() != '[':
+        raise ValueError('Expected a JSON array')
+    pos += 1
+    if next_char() == ']':
+        return
+    while True:
+        next_char()
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+        yield value
+        char = next_char()
+        pos += 1
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError(f'Expected "," or "]" in JSON array, got {char!r}')
+
+READERS = {
+    'ndjson': read_ndjson,
+    'json': read_json_array,
+    'csv': csv.DictReader,
+}
+
+class PostImporter:
+    """
+    Creates posts from dicts with title, content, author (a username) and optionally date_posted, as
+    produced by blog.export. Each batch costs a handful of queries: authors, titles and slugs are looked up
+    with one IN query each, posts are inserted with bulk_create and the batch is indexed for search and
+    counted in the post statistics in the same transaction. Rows that can not be imported are reported to
+    on_skip(row_number, reason) and skipped.
+    """
+    def __init__(self, batch_size=BATCH_SIZE, on_skip=None):
+        self.batch_size = batch_size
+        self.on_skip = on_skip
+        self.imported = 0
+        self.skipped = 0
+        self._author_ids = {}
+
+    def run(self, rows):
+        """ Imports rows batch by batch, yielding after each committed batch """
+        rows = enumerate(rows, start=1)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                return
+            self.import_batch(batch)
+            yield
+
+    def skip(self, number, reason):
+        self.skipped += 1
+        if self.on_skip is not None:
+            self.on_skip(number, reason)
+
+    def import_batch(self, batch):
+        candidates = []
+        for number, row in batch:
+            title, content, author = (row.get(field) or '' for field in ('title', 'content', 'author'))
+            if not title or not content or not author:
+                self.skip(number, 'title, content and author are required')
+            elif len(title) > TITLE_MAX_LENGTH:
+                self.skip(number, f'title is longer than {TITLE_MAX_LENGTH} characters')
+            else:
+                try:
+                    date_posted = parse_timestamp(row['date_posted']) if row.get('date_posted') else timezone.now()
+                except ValueError as error:
+                    self.skip(number, str(error))
+                    continue
+                candidates.append((number, title, content, author, date_posted))
+
+        self._resolve_authors({candidate[3] for candidate in candidates})
+        titles = {candidate[1] for candidate in candidates}
+        existing_titles = set(Post.objects.filter(title__in=titles).values_list('title', flat=True))
+        slugs = {slug_from_title(title) for title in titles}
+        taken_slugs = set(Post.objects.filter(slug__in=slugs).values_list('slug', flat=True))
+
+        posts = []
+        for number, title, content, author, date_posted in candidates:
+            if author not in self._author_ids:
+                self.skip(number, f'unknown author {author!r}')
+            elif title in existing_titles:
+                self.skip(number, f'a post titled {title!r} already exists')
+            else:
+                existing_titles.add(title)
+                post = Post(title=title, content=content, author_id=self._author_ids[author],
+                    date_posted=date_posted, slug=self._unique_slug(slug_from_title(title), taken_slugs))
+                post.render()
+                posts.append(post)
+        if not posts:
+            return
+
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            # bulk_create skips post_save, so index and count the new rows here; their ids are not returned on
+            # every database
+            get_search_backend().index(Post.objects.filter(title__in=[post.title for post in posts])
+                .only('id', 'title', 'content'))
+            record_posts(posts)
+        self.imported += len(posts)
+        bump_feed_version()
+        bump_posts_version()
+        bump_pages_version()
+        for author_id in {post.author_id for post in posts}:
+            bump_feed_version(author_id)
+            bump_posts_version(author_id)
+
+    def _resolve_authors(self, usernames):
+        missing = usernames - self._author_ids.keys()
+        if missing:
+            self._author_ids.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+
+    def _unique_slug(self, slug, taken_slugs):
+        """ slug, or slug_2, slug_3... if another post (existing or in this batch) already has it """
+        if slug in taken_slugs:
+            taken_slugs.update(Post.objects.filter(slug__startswith=f'{slug}_').values_list('slug', flat=True))
+            slug = free_slug(slug, taken_slugs)
+        taken_slugs.add(slug)
+        return slug
@@ -0,0 +1,21 @@
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+import functools
+
+@functools.lru_cache(maxsize=4096)
+def _reverse(urlconf, script_prefix, viewname, args):
+    return reverse(viewname, urlconf=urlconf, args=args)
+
+def cached_reverse(viewname, *args):
+    """
+    reverse() memoized per URLconf and script prefix, for the URLs rendered over and over on every page,
+    such as navigation links and the post and author links of list rows
+    """
+    return _reverse(get_urlconf(), get_script_prefix(), viewname, args)
+
+@receiver(setting_changed)
+def clear_cached_urls(setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        _reverse.cache_clear()
@@ -0,0 +1,85 @@
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.test.utils import (override_settings, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment)
+
+import functools
+import json
+import platform
+import time
+
+from blog import benchmark
+
+class Command(BaseCommand):
+    help = ('Seeds users and posts, then measures p50/p95 latency, queries per request and throughput of the main '
+            'pages and prints them as JSON, to be compared between releases')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Users to seed')
+        parser.add_argument('--posts', type=int, default=5000, help='Posts to seed, spread over the users')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per page')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per page sent first')
+        parser.add_argument('--url',
+            help='Benchmark the server running at this URL instead of the test client. Seeds the configured '
+                 'database, which the server must be using. Queries per request are read from its Server-Timing '
+                 'header, so it must run with METRICS_SERVER_TIMING = True, which settings_production turns off.')
+        parser.add_argument('--page-cache', action='store_true',
+            help='Let the anonymous page cache answer, by default a session cookie makes every page render')
+        parser.add_argument('--output', help='File to write the JSON report to, stdout by default')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['posts'] < 1 or options['requests'] < 1:
+            raise CommandError('--users, --posts and --requests must be at least 1')
+        if options['url']:
+            self.check_server_timing(options['url'])
+            report = self.run(options, functools.partial(benchmark.HttpDriver, options['url'],
+                page_cache=options['page_cache']))
+        else:
+            report = self.run_in_test_client(options)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def check_server_timing(self, url):
+        """ Fails before seeding if the server does not report its query counts, which the report would lack """
+        try:
+            _, _, queries = benchmark.HttpDriver(url).request('GET', reverse('blog-about'))
+        except OSError as error:
+            raise CommandError(f'Could not reach {url}: {error}')
+        if queries is None:
+            raise CommandError(f'{url} sends no query counts in a Server-Timing header. Run it with '
+                'METRICS_SERVER_TIMING = True, settings_production turns it off.')
+
+    def run_in_test_client(self, options):
+        """ Runs against throwaway test databases and a private cache, like the test runner """
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'benchmark'}}, METRICS_SERVER_TIMING=True):
+                return self.run(options, functools.partial(benchmark.ClientDriver, page_cache=options['page_cache']))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options, new_driver):
+        started = time.perf_counter()
+        usernames = benchmark.seed(options['users'], options['posts'])
+        seed_seconds = time.perf_counter() - started
+        return {
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'target': options['url'] or 'test client',
+                'page_cache': options['page_cache'],
+            },
+            'seed': {'users': options['users'], 'posts': options['posts'], 'seconds': round(seed_seconds, 2)},
+            'pages': benchmark.run(new_driver, usernames, options['requests'], options['warmup']),
+        }
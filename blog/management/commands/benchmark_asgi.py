@@ -0,0 +1,124 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+import asyncio
+import contextlib
+import importlib.util
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from blog.models import Post
+
+STACKS = ('wsgi', 'asgi')
+
+class Command(BaseCommand):
+    help = ('Serves the site once over WSGI (gunicorn, or Django\'s threaded server without it) and once over ASGI '
+            '(uvicorn), and compares their throughput and latency under many concurrent connections')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stack', choices=STACKS, action='append', help='Stack to run, both by default')
+        parser.add_argument('--threads', type=int, default=8, help='Threads of the gunicorn worker')
+        parser.add_argument('--path', action='append', help='Path to request, home, about and a post by default')
+        parser.add_argument('--concurrency', type=int, default=100, help='Connections kept open at the same time')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests sent to each stack')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--page-cache', action='store_true',
+            help='Let the anonymous page cache answer, by default a session cookie makes every view render')
+
+    def handle(self, *args, **options):
+        stacks = options['stack'] or list(STACKS)
+        if 'asgi' in stacks and importlib.util.find_spec('uvicorn') is None:
+            raise CommandError('uvicorn is required, see requirements.txt')
+        paths = options['path'] or self.default_paths()
+        headers = '' if options['page_cache'] else 'Cookie: sessionid=benchmark\r\n'
+        self.stdout.write(f'{options["requests"]} requests over {options["concurrency"]} connections to '
+            f'{", ".join(paths)}')
+        for stack in stacks:
+            command, name = self.server_command(stack, options['port'], options['threads'])
+            with self.server(command, name, options['port']):
+                latencies, errors, elapsed = asyncio.run(self.load(options['port'], paths, headers,
+                    options['concurrency'], options['requests']))
+            self.report(f'{stack} ({name})', latencies, errors, elapsed)
+
+    def default_paths(self):
+        paths = [reverse('blog-home'), reverse('blog-about')]
+        post = Post.objects.order_by('-date_posted').only('slug').first()
+        if post is not None:
+            paths.append(post.get_absolute_url())
+        return paths
+
+    def server_command(self, stack, port, threads):
+        """ (command line, server name) serving the site on port, each server running a single process """
+        if stack == 'asgi':
+            return ([sys.executable, '-m', 'uvicorn', 'my_blog.asgi:application', '--port', str(port),
+                '--log-level', 'warning', '--no-access-log'], 'uvicorn')
+        if importlib.util.find_spec('gunicorn') is not None:
+            return ([sys.executable, '-m', 'gunicorn', 'my_blog.wsgi:application', '--bind', f'127.0.0.1:{port}',
+                '--worker-class', 'gthread', '--threads', str(threads), '--log-level', 'warning'], 'gunicorn')
+        # a thread per connection, like a threaded gunicorn worker with as many threads as connections
+        return ([sys.executable, '-m', 'django', 'runserver', '--noreload', f'127.0.0.1:{port}'], 'runserver')
+
+    @contextlib.contextmanager
+    def server(self, command, name, port):
+        # runserver logs every request, which would cost as much as serving it on the terminal
+        output = subprocess.DEVNULL if name == 'runserver' else None
+        process = subprocess.Popen(command, stdout=output, stderr=output)
+        try:
+            deadline = time.monotonic() + 15
+            while True:
+                with contextlib.suppress(OSError), socket.create_connection(('127.0.0.1', port), timeout=1):
+                    break
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise CommandError(f'{name} did not start on port {port}')
+                time.sleep(0.1)
+            yield
+        finally:
+            process.terminate()
+            process.wait()
+
+    async def load(self, port, paths, headers, concurrency, total):
+        latencies, errors = [], 0
+        remaining = iter(range(total))
+
+        async def fetch(path):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}Connection: close\r\n\r\n'.encode())
+                await writer.drain()
+                status_line = await reader.readline()
+                await reader.read()
+            finally:
+                writer.close()
+            return int(status_line.split()[1])
+
+        async def client():
+            nonlocal errors
+            for i in remaining:
+                started = time.perf_counter()
+                try:
+                    status = await fetch(paths[i % len(paths)])
+                except (OSError, IndexError, ValueError):
+                    status = None
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - started
+
+    def report(self, stack, latencies, errors, elapsed):
+        if not latencies:
+            self.stdout.write(f'{stack}: every request failed ({errors})')
+            return
+        latencies = sorted(latency * 1000 for latency in latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        self.stdout.write(f'{stack}: {len(latencies) / elapsed:.0f} req/s, mean {statistics.mean(latencies):.1f} ms, '
+            f'p50 {percentile(0.5):.1f} ms, p99 {percentile(0.99):.1f} ms, {errors} error(s)')
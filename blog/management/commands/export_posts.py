@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import FORMATS, export_rows, parse_timestamp, CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = 'Writes every post, with its author\'s username, as NDJSON or a JSON array'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only posts updated at or after this ISO 8601 date or datetime')
+        parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+        parser.add_argument('-o', '--output', help='File to write to, stdout by default')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Posts read from the database at a time')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_timestamp(options['since'])
+            except ValueError as error:
+                raise CommandError(error)
+        serialize = FORMATS[options['format']][1]
+        chunks = serialize(export_rows(since, chunk_size=options['chunk_size']))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
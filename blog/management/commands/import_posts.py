@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import BATCH_SIZE, READERS, PostImporter
+
+import csv
+import sys
+import time
+
+class Command(BaseCommand):
+    help = 'Creates posts from NDJSON, a JSON array or CSV with title, content, author and optional date_posted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, - for stdin')
+        parser.add_argument('--format', choices=list(READERS),
+            help='Input format, guessed from the file extension by default (ndjson unless .json or .csv)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Posts inserted per transaction')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or next(
+            (name for name in ('json', 'csv') if path.lower().endswith(f'.{name}')), 'ndjson')
+
+        def on_skip(number, reason):
+            self.stderr.write(f'Skipped row {number}: {reason}')
+
+        importer = PostImporter(batch_size=options['batch_size'], on_skip=on_skip)
+        started = time.monotonic()
+        try:
+            file = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(error)
+        try:
+            for _ in importer.run(READERS[input_format](file)):
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{importer.imported} post(s) imported...')
+        except (ValueError, csv.Error) as error:
+            raise CommandError(f'Invalid {input_format} input: {error}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        elapsed = time.monotonic() - started
+        rate = (importer.imported + importer.skipped) / elapsed if elapsed else 0
+        self.stdout.write(f'Imported {importer.imported} post(s), skipped {importer.skipped} in {elapsed:.2f}s '
+            f'({rate:.0f} rows/s)')
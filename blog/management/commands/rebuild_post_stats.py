@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.sidebar import invalidate_sidebar
+from blog.stats import rebuild_post_stats
+
+import time
+
+class Command(BaseCommand):
+    help = ('Recomputes the post counts per author (Profile.post_count) and per month (sidebar archive) from the '
+            'post table, correcting any drift from writes that bypassed the Post signals')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        corrected, months = rebuild_post_stats()
+        invalidate_sidebar()
+        self.stdout.write(f'Corrected {corrected} profile post count(s) and counted {months} archive month(s) in '
+            f'{time.monotonic() - started:.2f}s')
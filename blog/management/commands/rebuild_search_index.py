@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_backend
+
+import time
+
+class Command(BaseCommand):
+    help = 'Rebuilds the post search index from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts read and indexed per batch')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = get_search_backend().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(f'Indexed {count} post(s) in {time.monotonic() - started:.2f}s')
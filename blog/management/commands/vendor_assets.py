@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+import os
+import urllib.request
+
+from blog.assets import VENDOR_ASSETS, integrity
+
+class Command(BaseCommand):
+    help = ('Downloads the pinned third-party CSS and JavaScript of blog.assets into blog/static, checking them '
+            'against their integrity hash, so pages load them from the site itself')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Download assets that are already vendored again')
+
+    def handle(self, *args, **options):
+        static_dir = os.path.join(apps.get_app_config('blog').path, 'static')
+        for name, (path, url, expected) in VENDOR_ASSETS.items():
+            destination = os.path.join(static_dir, *path.split('/'))
+            if os.path.exists(destination) and not options['force']:
+                self.stdout.write(f'{name}: already vendored')
+                continue
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    content = response.read()
+            except OSError as error:
+                raise CommandError(f'{name}: could not download {url}: {error}')
+            if integrity(content, expected.split('-', 1)[0]) != expected:
+                raise CommandError(f'{name}: {url} does not match its integrity hash')
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            with open(destination, 'wb') as file:
+                file.write(content)
+            self.stdout.write(f'{name}: saved {len(content)} bytes to {destination}')
@@ -0,0 +1,161 @@
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+
+import asyncio
+import hashlib
+import time
+
+from .cache import pages_version
+from .counters import post_views
+
+PAGE_KEY = 'blog:page:{}'
+LOCK_KEY = 'blog:page:lock:{}'
+# longest a single regeneration may take before another request is allowed to try
+LOCK_TIMEOUT = 30
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serves whole responses of settings.BLOG_PAGE_CACHE_VIEWS to anonymous GET and HEAD requests from the
+    cache, ahead of sessions, CSRF and authentication. Pages expire when pages_version() is bumped by a
+    Post or avatar change, or after BLOG_PAGE_CACHE_TIMEOUT. An expired page is still served for up to
+    BLOG_PAGE_CACHE_STALE_TIMEOUT while a single request, holding a lock, renders its replacement, so a
+    popular page never has every worker render it at once.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # lets Django call the instance as a coroutine function, as MiddlewareMixin does
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+        response, page = self.lookup(request)
+        if response is not None:
+            return response
+        try:
+            return self.store(request, page, self.get_response(request))
+        finally:
+            self.release(page)
+
+    async def __acall__(self, request):
+        if not self.is_cacheable_request(request):
+            return await self.get_response(request)
+        response, page = await sync_to_async(self.lookup)(request)
+        if response is not None:
+            return response
+        try:
+            return await sync_to_async(self.store)(request, page, await self.get_response(request))
+        finally:
+            await sync_to_async(self.release)(page)
+
+    def lookup(self, request):
+        """ (cached response, None) when the cache can answer, otherwise (None, page) to render and store """
+        key_hash = hashlib.md5(f'{request.get_host()}{request.get_full_path()}'.encode()).hexdigest()
+        entry = cache.get(PAGE_KEY.format(key_hash))
+        if entry is not None:
+            if entry['version'] == pages_version() and entry['fresh_until'] > time.time():
+                return self.cached_response(request, entry, 'hit'), None
+            # stale: only the request getting the lock regenerates, the rest keep serving the old page
+            if not cache.add(LOCK_KEY.format(key_hash), True, LOCK_TIMEOUT):
+                return self.cached_response(request, entry, 'stale'), None
+        # version read before rendering, so a change made while rendering leaves the stored page stale
+        return None, {'key_hash': key_hash, 'locked': entry is not None, 'version': pages_version()}
+
+    def store(self, request, page, response):
+        key = PAGE_KEY.format(page['key_hash'])
+        if not self.is_cacheable_response(response):
+            # e.g. the post is gone, so its stale page must not be served any longer
+            cache.delete(key)
+        elif request.method == 'GET':
+            cache.set(key, {
+                'version': page['version'],
+                'fresh_until': time.time() + settings.BLOG_PAGE_CACHE_TIMEOUT,
+                'response': response,
+            }, settings.BLOG_PAGE_CACHE_TIMEOUT + settings.BLOG_PAGE_CACHE_STALE_TIMEOUT)
+        response['X-Page-Cache'] = 'miss'
+        return response
+
+    def release(self, page):
+        if page['locked']:
+            cache.delete(LOCK_KEY.format(page['key_hash']))
+
+    def is_cacheable_request(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or CookieStorage.cookie_name in request.COOKIES:
+            return False
+        if 'HTTP_AUTHORIZATION' in request.META:
+            return False
+        try:
+            return resolve(request.path_info).url_name in settings.BLOG_PAGE_CACHE_VIEWS
+        except Resolver404:
+            return False
+
+    def is_cacheable_response(self, response):
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return False
+        cache_control = response.get('Cache-Control', '')
+        return 'private' not in cache_control and 'no-store' not in cache_control
+
+    def cached_response(self, request, entry, status):
+        """ The stored page, or a 304 when it matches the request's If-None-Match or If-Modified-Since """
+        cached = entry['response']
+        response = get_conditional_response(request, etag=cached.get('ETag'),
+            last_modified=parse_http_date_safe(cached.get('Last-Modified', '')), response=cached)
+        response['X-Page-Cache'] = status
+        return response
+
+class PostViewCountMiddleware:
+    """
+    Counts GET requests answered with a post's page, including those the page cache answers, in the
+    buffered counter of blog/counters.py. Belongs before AnonymousPageCacheMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # lets Django call the instance as a coroutine function, as MiddlewareMixin does
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        slug = self.viewed_post(request, response)
+        if slug is not None:
+            post_views.record(slug)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        slug = self.viewed_post(request, response)
+        if slug is not None:
+            # recording may flush to the database
+            await sync_to_async(post_views.record)(slug)
+        return response
+
+    def viewed_post(self, request, response):
+        """ Slug of the post whose page was served, if any """
+        if request.method != 'GET' or response.status_code not in (200, 304):
+            return None
+        match = request.resolver_match
+        if match is None:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return None
+        return match.kwargs.get('slug') if match.url_name == 'blog-post_detail' else None
@@ -0,0 +1,45 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:23
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+# frozen copies of blog.models.render_content and render_excerpt as of this migration
+EXCERPT_WORDS = 100
+
+
+def render_content(content):
+    return linebreaks(content, autoescape=True)
+
+
+def render_excerpt(content_html):
+    return Truncator(content_html).words(EXCERPT_WORDS, html=True, truncate=' …')
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.only('id', 'content').iterator():
+        post.content_html = render_content(post.content)
+        post.excerpt = render_excerpt(post.content_html)
+        post.save(update_fields=['content_html', 'excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
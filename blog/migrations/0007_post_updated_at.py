@@ -0,0 +1,24 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+def set_updated_at(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.update(updated_at=models.F('date_posted'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_content_html_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(set_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:50
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+import collections
+
+
+def count_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Profile = apps.get_model('user', 'Profile')
+    ArchiveMonth = apps.get_model('blog', 'ArchiveMonth')
+    author_posts = (Post.objects.filter(author=models.OuterRef('user')).order_by().values('author')
+        .annotate(count=models.Count('id')).values('count'))
+    Profile.objects.update(post_count=Coalesce(models.Subquery(author_posts), models.Value(0)))
+    months = collections.Counter()
+    for date_posted in Post.objects.values_list('date_posted', flat=True).iterator():
+        months[timezone.localtime(date_posted).date().replace(day=1)] += 1
+    ArchiveMonth.objects.bulk_create([ArchiveMonth(month=month, post_count=count) for month, count in months.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_view_count'),
+        ('user', '0003_profile_post_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                ('month', models.DateField(primary_key=True, serialize=False)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
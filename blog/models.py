@@ -1,21 +1,107 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DEFERRED
 from django.utils import timezone
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 from django.contrib.auth.models import User
-from django.urls import reverse
+
+from .links import cached_reverse
+
+EXCERPT_WORDS = 100
+
+def slug_from_title(title):
+    return title.replace(' ', '_')
+
+def free_slug(slug, taken_slugs):
+    """ slug, or the first of slug_2, slug_3... not in taken_slugs """
+    base, i = slug, 2
+    while slug in taken_slugs:
+        slug, i = f'{base}_{i}', i + 1
+    return slug
+
+def render_content(content):
+    return linebreaks(content, autoescape=True)
+
+def render_excerpt(content_html):
+    return Truncator(content_html).words(EXCERPT_WORDS, html=True, truncate=' …')
 
 class Post(models.Model):
     title = models.CharField(max_length=60, unique=True)
     content = models.TextField()
+    content_html = models.TextField(editable=False, default='')
+    excerpt = models.TextField(editable=False, default='')
     date_posted = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     slug = models.SlugField(null=False, unique=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date_posted', 'id'], name='blog_post_date_id_idx'),
+            models.Index(fields=['author', '-date_posted', 'id'], name='blog_post_author_date_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {name: value for name, value in zip(field_names, values) if value is not DEFERRED}
+        return instance
+
+    def get_loaded_value(self, attname, default=None):
+        """
+        Value of the field as last loaded from or saved to the database. Inside post_save receivers this
+        is still the value being replaced.
+        """
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
     def save(self, *args, **kwargs):
-        self.slug = self.title.replace(' ', '_')
-        super().save(*args, **kwargs)
+        # a slug suffixed on a collision is kept until the title changes
+        if not self.slug or self.title != self.get_loaded_value('title'):
+            self.slug = self.unique_slug()
+        self.render()
+        # post_save receivers update the author's post count, which must commit or roll back with the post
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        saved = [f for f in self._meta.concrete_fields if update_fields is None or f.name in update_fields]
+        self._loaded_values = {**getattr(self, '_loaded_values', {}),
+            **{f.attname: getattr(self, f.attname) for f in saved}}
+
+    def unique_slug(self):
+        """ Slug of the title, suffixed like the importer does if another post already has it """
+        slug = slug_from_title(self.title)
+        others = Post.objects.exclude(pk=self.pk)
+        if not others.filter(slug=slug).exists():
+            return slug
+        return free_slug(slug, {slug, *others.filter(slug__startswith=f'{slug}_').values_list('slug', flat=True)})
+
+    def render(self):
+        """ Precompute the HTML body and the feed excerpt so list pages never touch `content` """
+        self.content_html = render_content(self.content)
+        self.excerpt = render_excerpt(self.content_html)
 
     def get_absolute_url(self):
-        return reverse('blog-post_detail', kwargs={'slug': self.slug})
+        return cached_reverse('blog-post_detail', self.slug)
+
+    def get_author_url(self):
+        return cached_reverse('blog-user_posts', self.author.username)
+
+class PostViewCount(models.Model):
+    """ Views of a post, kept apart from Post so counting never touches updated_at or the post caches """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='view_count')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-count'], name='blog_postviewcount_count_idx'),
+        ]
+
+class ArchiveMonth(models.Model):
+    """ Number of posts per month, maintained by blog/stats.py for the sidebar archive """
+    # first day of the month, in settings.TIME_ZONE
+    month = models.DateField(primary_key=True)
+    post_count = models.PositiveIntegerField(default=0)
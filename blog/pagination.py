@@ -0,0 +1,109 @@
+from django.core import signing
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CountedPaginator(Paginator):
+    """ Page number paginator given its count up front, typically a maintained counter, so it never runs COUNT(*) """
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are addressed by an opaque cursor holding the ordering values of the
+    last row seen instead of an OFFSET, so every page costs one indexed range scan and no COUNT(*).
+    """
+    salt = 'blog.pagination.cursor'
+
+    def __init__(self, queryset, per_page, ordering=('-date_posted', 'id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field) for field in self.fields]
+        return signing.dumps({'v': [str(value) for value in values], 'd': direction}, salt=self.salt)
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=self.salt)
+            values, direction = data['v'], data['d']
+        except (signing.BadSignature, KeyError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+        if direction not in ('next', 'prev') or len(values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor')
+        return values, direction
+
+    def _seek(self, values, reverse):
+        """ Q object selecting rows after (or before, if reverse) the given ordering values """
+        condition = Q()
+        for i in reversed(range(len(self.ordering))):
+            field = self.fields[i]
+            descending = self.ordering[i].startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = Q(**{field: value for field, value in zip(self.fields[:i], values[:i])})
+            condition = equal & Q(**{f'{field}__{lookup}': values[i]}) | condition
+        return condition
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return CursorPage(rows[:self.per_page], self, has_next=len(rows) > self.per_page, has_previous=False)
+
+        values, direction = self.decode_cursor(cursor)
+        if direction == 'next':
+            rows = list(self.queryset.filter(self._seek(values, reverse=False))
+                .order_by(*self.ordering)[:self.per_page + 1])
+            return CursorPage(rows[:self.per_page], self, has_next=len(rows) > self.per_page, has_previous=True)
+
+        reversed_ordering = [field[1:] if field.startswith('-') else '-' + field for field in self.ordering]
+        rows = list(self.queryset.filter(self._seek(values, reverse=True))
+            .order_by(*reversed_ordering)[:self.per_page + 1])
+        object_list = rows[:self.per_page][::-1]
+        return CursorPage(object_list, self, has_next=True, has_previous=len(rows) > self.per_page)
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode_cursor(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode_cursor(self.object_list[0], 'prev')
@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+import itertools
+import re
+
+from .models import Post
+
+FTS_TABLE = 'blog_post_fts'
+FTS_INSERT = f'INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (%s, %s, %s)'
+
+def get_search_backend():
+    """ settings.BLOG_SEARCH_BACKEND, or SQLite FTS5 when running on SQLite and a plain scan otherwise """
+    path = settings.BLOG_SEARCH_BACKEND
+    if path is None:
+        path = 'blog.search.SQLiteFTS5Backend' if connection.vendor == 'sqlite' else 'blog.search.SimpleBackend'
+    return import_string(path)()
+
+def result_posts():
+    return Post.objects.select_related('author__profile').defer('content', 'content_html')
+
+class BaseSearchBackend:
+    def index(self, posts):
+        """ Add or replace the given posts in the index """
+        raise NotImplementedError('subclasses of BaseSearchBackend must provide an index() method')
+
+    def remove(self, post_ids):
+        raise NotImplementedError('subclasses of BaseSearchBackend must provide a remove() method')
+
+    def rebuild(self, batch_size=1000):
+        """ Reindex every post, returns the number of posts indexed """
+        raise NotImplementedError('subclasses of BaseSearchBackend must provide a rebuild() method')
+
+    def search(self, query):
+        """ Ranked posts matching query, as a sliceable sequence with count() usable by Paginator """
+        raise NotImplementedError('subclasses of BaseSearchBackend must provide a search() method')
+
+class SimpleBackend(BaseSearchBackend):
+    """ No index at all, every search scans the post table. Only meant for databases without FTS support """
+    def index(self, posts):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def rebuild(self, batch_size=1000):
+        return 0
+
+    def search(self, query):
+        condition = Q()
+        for term in re.findall(r'\w+', query):
+            condition &= Q(title__icontains=term) | Q(content__icontains=term)
+        if not condition:
+            return Post.objects.none()
+        return result_posts().filter(condition).order_by('-date_posted')
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """ Inverted index in the blog_post_fts virtual table created by blog/migrations/0008_post_search_index.py """
+    # bm25 weights of the title and content columns
+    weights = (10.0, 1.0)
+
+    def index(self, posts):
+        rows = [(post.pk, post.title, post.content) for post in posts]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(FTS_INSERT, rows)
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in post_ids])
+
+    def rebuild(self, batch_size=1000):
+        count = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            rows = Post.objects.values_list('id', 'title', 'content').iterator(chunk_size=batch_size)
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                cursor.executemany(FTS_INSERT, batch)
+                count += len(batch)
+        return count
+
+    def search(self, query):
+        # quoting every term keeps user input from being parsed as FTS5 query syntax
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        return FTS5Results(self, ' '.join(f'"{term}"' for term in terms))
+
+class FTS5Results:
+    def __init__(self, backend, match):
+        self.backend = backend
+        self.match = match
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [self.match])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        weights = ', '.join(str(weight) for weight in self.backend.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s OFFSET %s',
+                [self.match, limit, start])
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = result_posts().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
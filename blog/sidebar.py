@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from user.models import Profile
+from .cache import bump_pages_version, bump_posts_version, posts_version
+from .models import ArchiveMonth, Post
+
+SIDEBAR_KEY = 'blog:sidebar:{}'
+RECENT_POSTS = 5
+TOP_AUTHORS = 5
+ARCHIVE_MONTHS = 12
+
+def sidebar_data():
+    """
+    Recent posts, top authors and archive months. Pages read them with one cache lookup; only the first
+    render after a post changes runs the three queries, each a LIMIT scan of an index (Post.date_posted,
+    Profile.post_count, ArchiveMonth.month).
+    """
+    key = SIDEBAR_KEY.format(posts_version())
+    data = cache.get(key)
+    if data is None:
+        data = {
+            'recent_posts': list(Post.objects.order_by('-date_posted').values('title', 'slug')[:RECENT_POSTS]),
+            'top_authors': list(Profile.objects.filter(post_count__gt=0).order_by('-post_count')
+                .values('post_count', username=F('user__username'))[:TOP_AUTHORS]),
+            'archive_months': list(ArchiveMonth.objects.filter(post_count__gt=0).order_by('-month')
+                .values('month', 'post_count')[:ARCHIVE_MONTHS]),
+        }
+        cache.set(key, data, settings.BLOG_FEED_CACHE_TIMEOUT)
+    return data
+
+def invalidate_sidebar():
+    """
+    Drop the cached sidebar_data() after counters were changed without touching any post, together with
+    the cached pages and the ETags that include it
+    """
+    bump_posts_version()
+    bump_pages_version()
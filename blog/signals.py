@@ -0,0 +1,73 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+
+from user.models import Profile
+from .cache import bump_feed_version, bump_posts_version, bump_pages_version
+from .models import Post
+from .search import get_search_backend
+from .stats import post_month, record_posts, update_post_stats
+
+import collections
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    bump_feed_version()
+    bump_posts_version()
+    # a post moved to another author leaves the previous author's feed too
+    for author_id in {instance.author_id, instance.get_loaded_value('author_id', instance.author_id)}:
+        bump_feed_version(author_id)
+        bump_posts_version(author_id)
+    bump_pages_version()
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index([instance])
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_posts([instance])
+        return
+    # a post moved to another author or month is counted elsewhere, any other change is a no-op
+    author_deltas = collections.Counter({instance.author_id: 1})
+    author_deltas[instance.get_loaded_value('author_id', instance.author_id)] -= 1
+    month_deltas = collections.Counter({post_month(instance.date_posted): 1})
+    month_deltas[post_month(instance.get_loaded_value('date_posted', instance.date_posted))] -= 1
+    update_post_stats(author_deltas, month_deltas)
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    record_posts([instance], -1)
+
+@receiver(post_save, sender=Profile)
+def invalidate_profile_feeds(sender, instance, **kwargs):
+    if {'img', 'img_hash'} & instance.get_changed_fields():
+        bump_feed_version()
+        bump_feed_version(instance.user_id)
+        bump_pages_version()
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    # read from __dict__ so a deferred username is not fetched
+    instance._loaded_username = instance.__dict__.get('username')
+
+@receiver(post_save, sender=User)
+def invalidate_user_feeds(sender, instance, created, update_fields=None, **kwargs):
+    """ Usernames are in every feed, page and sidebar linking to the author's posts """
+    renamed = not created and (update_fields is None or 'username' in update_fields)
+    if renamed and instance._loaded_username is not None and instance.username != instance._loaded_username:
+        bump_feed_version()
+        bump_posts_version()
+        bump_feed_version(instance.pk)
+        bump_posts_version(instance.pk)
+        bump_pages_version()
+    instance._loaded_username = instance.username
@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, TruncMonth
+from django.utils import timezone
+
+from user.models import Profile
+from .models import ArchiveMonth, Post
+
+import collections
+
+def post_month(date_posted):
+    """ First day of the month date_posted falls in, in settings.TIME_ZONE """
+    return timezone.localtime(date_posted).date().replace(day=1)
+
+def _add_counts(queryset, key, deltas):
+    by_delta = collections.defaultdict(list)
+    for value, delta in deltas.items():
+        by_delta[delta].append(value)
+    # one UPDATE per distinct delta, which is a single statement for a save, a delete or an import batch
+    for delta, values in by_delta.items():
+        queryset.filter(**{f'{key}__in': values}).update(post_count=Greatest(F('post_count') + delta, Value(0)))
+
+def update_post_stats(author_deltas, month_deltas):
+    """
+    Add {author id: delta} to Profile.post_count and {month: delta} to ArchiveMonth. Counters are only
+    changed with relative UPDATEs, so concurrent writers never lose each other's changes.
+    """
+    author_deltas = {author_id: delta for author_id, delta in author_deltas.items() if delta}
+    month_deltas = {month: delta for month, delta in month_deltas.items() if delta}
+    if not author_deltas and not month_deltas:
+        return
+    with transaction.atomic():
+        _add_counts(Profile.objects, 'user_id', author_deltas)
+        if month_deltas:
+            ArchiveMonth.objects.bulk_create([ArchiveMonth(month=month) for month in month_deltas],
+                ignore_conflicts=True)
+            _add_counts(ArchiveMonth.objects, 'month', month_deltas)
+
+def record_posts(posts, delta=1):
+    """ Count (delta=1) or uncount (delta=-1) the given posts """
+    author_deltas = collections.Counter()
+    month_deltas = collections.Counter()
+    for post in posts:
+        author_deltas[post.author_id] += delta
+        month_deltas[post_month(post.date_posted)] += delta
+    update_post_stats(author_deltas, month_deltas)
+
+def rebuild_post_stats():
+    """
+    Recompute Profile.post_count and ArchiveMonth from the post table, in case they drifted through
+    writes that bypass signals. Returns (profiles corrected, months counted).
+    """
+    with transaction.atomic():
+        author_posts = (Post.objects.filter(author=OuterRef('user')).order_by().values('author')
+            .annotate(count=Count('id')).values('count'))
+        actual = Coalesce(Subquery(author_posts), Value(0))
+        corrected = Profile.objects.exclude(post_count=actual).update(post_count=actual)
+
+        months = collections.Counter()
+        for month, count in (Post.objects.annotate(month=TruncMonth('date_posted')).values('month')
+                .annotate(count=Count('id')).values_list('month', 'count')):
+            months[timezone.localtime(month).date()] += count
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.bulk_create([ArchiveMonth(month=month, post_count=count)
+            for month, count in months.items()])
+    return corrected, len(months)
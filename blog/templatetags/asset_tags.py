@@ -0,0 +1,10 @@
+from django import template
+
+from blog.assets import asset_tag
+
+register = template.Library()
+
+@register.simple_tag
+def vendor_asset(name):
+    """ Tag loading one of blog.assets.VENDOR_ASSETS, e.g. {% vendor_asset 'bootstrap.css' %} """
+    return asset_tag(name)
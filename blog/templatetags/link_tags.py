@@ -0,0 +1,10 @@
+from django import template
+
+from blog.links import cached_reverse
+
+register = template.Library()
+
+@register.simple_tag
+def cached_url(viewname, *args):
+    """ {% url %} for positional arguments, memoized by blog.links.cached_reverse """
+    return cached_reverse(viewname, *args)
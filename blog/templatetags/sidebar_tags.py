@@ -0,0 +1,10 @@
+from django import template
+
+from blog.sidebar import sidebar_data
+
+register = template.Library()
+
+@register.inclusion_tag('blog/sidebar.html')
+def sidebar():
+    """ Recent posts, top authors and archive widgets, rendered from the cached sidebar_data() """
+    return sidebar_data()
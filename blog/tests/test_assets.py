@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase, override_settings
+from django.template import Context, Template
+from django.core.checks.registry import registry
+
+import os
+import shutil
+import tempfile
+
+from blog.assets import VENDOR_ASSETS, asset_tag, check_vendor_assets, integrity
+
+class TestVendorAssets(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings = override_settings(STATICFILES_DIRS=[self.directory],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'])
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _vendor(self, name, content):
+        path = os.path.join(self.directory, VENDOR_ASSETS[name][0])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+
+    def test_tags_point_at_vendored_copies(self):
+        self._vendor('bootstrap.css', b'css')
+        self._vendor('jquery.js', b'js')
+        path, _, _ = VENDOR_ASSETS['bootstrap.css']
+        rendered = Template('{% load asset_tags %}{% vendor_asset "bootstrap.css" %}').render(Context())
+        self.assertEqual(rendered, f'<link rel="stylesheet" href="/static/{path}">')
+        path, _, _ = VENDOR_ASSETS['jquery.js']
+        self.assertEqual(asset_tag('jquery.js'), f'<script src="/static/{path}"></script>')
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.ManifestStaticFilesStorage')
+    def test_missing_asset_loaded_from_cdn(self):
+        # a manifest storage would raise for a file that is not in the tree
+        _, url, sri = VENDOR_ASSETS['popper.js']
+        self.assertEqual(asset_tag('popper.js'),
+            f'<script src="{url}" integrity="{sri}" crossorigin="anonymous"></script>')
+
+    def test_check_missing(self):
+        errors = check_vendor_assets(None)
+        self.assertEqual([error.id for error in errors], ['blog.W001'] * len(VENDOR_ASSETS))
+        self.assertIn(check_vendor_assets, registry.get_checks())
+
+    def test_check_integrity(self):
+        self._vendor('jquery.js', b'tampered')
+        errors = check_vendor_assets(None)
+        self.assertEqual([error.id for error in errors].count('blog.E002'), 1)
+        self.assertIn('jquery.js', next(error.msg for error in errors if error.id == 'blog.E002'))
+
+    def test_integrity(self):
+        self.assertEqual(integrity(b'alert(1)'),
+            'sha384-HT2E9NfWiuQ/w1PRai+hTyqW16NIoCGA/m8VQDUopfAtcz6YQjtsMmQd5uRbVDpW')
@@ -0,0 +1,58 @@
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+
+from blog.benchmark import ClientDriver, HttpDriver, run, seed, summarize
+from blog.models import Post
+from user.models import Profile
+
+class TestBenchmark(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_is_repeatable(self):
+        usernames = seed(3, 10)
+        self.assertEqual(usernames, ['benchmark0', 'benchmark1', 'benchmark2'])
+        seed(3, 12)
+        self.assertEqual(User.objects.filter(username__startswith='benchmark').count(), 3)
+        self.assertEqual(Profile.objects.filter(user__username__startswith='benchmark').count(), 3)
+        self.assertEqual(Post.objects.count(), 12)
+        self.assertEqual(Profile.objects.get(user__username='benchmark0').post_count, 4)
+
+    def test_summarize(self):
+        samples = [(200, i / 1000, 2) for i in range(1, 101)] + [(404, 0.5, None)]
+        report = summarize(samples, 2.0)
+        self.assertEqual(report['requests'], 101)
+        self.assertEqual(report['statuses'], {'200': 100, '404': 1})
+        self.assertEqual(report['p50_ms'], 51)
+        self.assertEqual(report['p95_ms'], 96)
+        self.assertEqual(report['queries_mean'], 2)
+        self.assertEqual(report['throughput_rps'], 50.5)
+
+    @override_settings(METRICS_SERVER_TIMING=True)
+    def test_run_with_test_client(self):
+        usernames = seed(2, 25)
+        report = run(ClientDriver, usernames, requests=3, warmup=1)
+        self.assertEqual(set(report), {'blog-home', 'blog-home-deep', 'blog-user_posts', 'blog-post_detail',
+            'user-profile', 'user-login'})
+        self.assertEqual(report['user-login']['statuses'], {'302': 3})
+        for name in ['blog-home', 'blog-home-deep', 'blog-user_posts', 'blog-post_detail', 'user-profile']:
+            self.assertEqual(report[name]['statuses'], {'200': 3}, name)
+        # the session cookie keeps the page cache from answering
+        self.assertGreater(report['blog-post_detail']['queries_mean'], 0)
+
+class TestBenchmarkServer(LiveServerTestCase):
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_requires_server_timing(self):
+        with self.assertRaisesMessage(CommandError, 'METRICS_SERVER_TIMING'):
+            call_command('benchmark', url=self.live_server_url, users=1, posts=1, requests=1)
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(METRICS_SERVER_TIMING=True)
+    def test_http_driver_counts_queries(self):
+        seed(1, 1)
+        status, _, queries = HttpDriver(self.live_server_url).request('GET', Post.objects.get().get_absolute_url())
+        self.assertEqual(status, 200)
+        self.assertGreater(queries, 0)
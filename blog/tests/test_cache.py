@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from blog.cache import feed_version
+from blog.models import Post
+from blog.sidebar import sidebar_data
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestFeedCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='testUser')
+        self.otherUser = User.objects.create(username='otherUser')
+        self.post = Post.objects.create(title='test Post', content='test Post content', author=self.user)
+        Post.objects.create(title='other Post', content='other Post content', author=self.otherUser)
+
+    def _post_queries(self, url):
+        """ number of queries selecting posts while rendering given url, besides the sidebar's own """
+        sidebar_data()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # aggregates are the conditional GET validators, not the list itself
+        return response, [q for q in ctx.captured_queries if 'FROM "blog_post"' in q['sql']
+            and 'COUNT' not in q['sql'] and 'MAX(' not in q['sql']]
+
+    def test_home_feed_cached(self):
+        url = reverse('blog-home')
+        _, queries = self._post_queries(url)
+        self.assertEqual(len(queries), 1)
+        response, queries = self._post_queries(url)
+        self.assertEqual(len(queries), 0)
+        self.assertContains(response, 'test Post')
+
+    def test_user_feed_cached_per_author(self):
+        self._post_queries(reverse('blog-user_posts', args=[self.user]))
+        response, queries = self._post_queries(reverse('blog-user_posts', args=[self.otherUser]))
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, 'other Post')
+        self.assertNotContains(response, 'test Post content')
+
+    def test_post_save_invalidates(self):
+        self._post_queries(reverse('blog-home'))
+        self._post_queries(reverse('blog-user_posts', args=[self.otherUser]))
+        self.post.title = 'test Post Updated'
+        self.post.save()
+
+        response, queries = self._post_queries(reverse('blog-home'))
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, 'test Post Updated')
+        # other author's feed is untouched
+        _, queries = self._post_queries(reverse('blog-user_posts', args=[self.otherUser]))
+        self.assertEqual(len(queries), 0)
+
+    def test_post_delete_invalidates(self):
+        self._post_queries(reverse('blog-user_posts', args=[self.user]))
+        self.post.delete()
+        response, _ = self._post_queries(reverse('blog-user_posts', args=[self.user]))
+        self.assertNotContains(response, 'test Post content')
+
+    def test_profile_img_change_invalidates(self):
+        home_version = feed_version()
+        user_version = feed_version(self.user.pk)
+        other_version = feed_version(self.otherUser.pk)
+        profile = self.user.profile
+        profile.img = 'profile_pics/missing.jpg'
+        # skip image processing, only the row changes
+        profile.save_base(update_fields=['img'])
+        self.assertNotEqual(feed_version(), home_version)
+        self.assertNotEqual(feed_version(self.user.pk), user_version)
+        self.assertEqual(feed_version(self.otherUser.pk), other_version)
+
+    def test_pages_cached_separately(self):
+        for i in range(10):
+            Post.objects.create(title=f'page Post {i}', content='page Post content', author=self.user)
+        self._post_queries(reverse('blog-home'))
+        response, queries = self._post_queries(reverse('blog-home') + '?page=2')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context['feed_page'], 2)
+
+class TestFileBasedFeedCache(TestFeedCache):
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls._cache_settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cls.cache_dir,
+        }})
+        cls._cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._cache_settings.disable()
+        shutil.rmtree(cls.cache_dir)
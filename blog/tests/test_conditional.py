@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog.counters import post_views
+from blog.models import Post
+
+import io
+
+# the views' own validators, without the anonymous page cache answering in front of them
+@override_settings(BLOG_PAGE_CACHE_VIEWS=[])
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        # no view count flush may land in a counted request
+        post_views.flush()
+        self.user = User.objects.create(username='testUser')
+        self.post = Post.objects.create(title='test Post', content='test Post content', author=self.user)
+        self.urls = [
+            reverse('blog-home'),
+            reverse('blog-user_posts', args=[self.user]),
+            reverse('blog-post_detail', args=[self.post.slug]),
+        ]
+
+    def test_validators_set(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.has_header('ETag'), url)
+        # lists can lose rows without their latest update changing, and every page shows the sidebar
+        for url in self.urls:
+            self.assertFalse(self.client.get(url).has_header('Last-Modified'), url)
+
+    def test_etag_not_modified(self):
+        """ 304 responses cost only the validator lookups """
+        for url, queries in zip(self.urls, [1, 2, 1]):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(queries):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response.content, b'')
+
+    def test_edit_invalidates(self):
+        Post.objects.filter(pk=self.post.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.post.content = 'test Post content Updated'
+        self.post.save()
+        for url in self.urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_new_post_invalidates_lists(self):
+        etag = self.client.get(self.urls[0])['ETag']
+        Post.objects.create(title='test Post1', content='test Post1 content', author=self.user)
+        self.assertEqual(self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_delete_invalidates_lists(self):
+        other = Post.objects.create(title='test Post1', content='test Post1 content', author=self.user)
+        etag = self.client.get(self.urls[1])['ETag']
+        self.post.delete()
+        self.assertEqual(self.client.get(self.urls[1], HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertTrue(Post.objects.filter(pk=other.pk).exists())
+
+    def test_other_author_post_invalidates_sidebar_pages(self):
+        """ the sidebar lists every author's posts, so the pages of one author change with the others' """
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls[1:]}
+        other = User.objects.create(username='otherUser')
+        Post.objects.create(title='other Post', content='other Post content', author=other)
+        for url in self.urls[1:]:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+            self.assertContains(response, 'other Post')
+
+    def test_reconcile_invalidates_sidebar_pages(self):
+        etag = self.client.get(self.urls[2])['ETag']
+        call_command('rebuild_post_stats', stdout=io.StringIO())
+        self.assertEqual(self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_delete_not_hidden_by_if_modified_since(self):
+        older = Post.objects.create(title='test Post1', content='test Post1 content', author=self.user)
+        Post.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        if_modified_since = http_date(timezone.now().timestamp() + 60)
+        older.delete()
+        for url in self.urls:
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=if_modified_since)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotContains(response, 'test Post1')
+
+    def test_etag_differs_per_user(self):
+        etag = self.client.get(self.urls[2])['ETag']
+        self.client.force_login(self.user)
+        response = self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Update')
+
+    def test_etag_differs_per_page(self):
+        for i in range(10):
+            Post.objects.create(title=f'page Post {i}', content='page Post content', author=self.user)
+        etag = self.client.get(self.urls[0])['ETag']
+        response = self.client.get(self.urls[0] + '?page=2', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_post_not_found(self):
+        response = self.client.get(reverse('blog-post_detail', args=['nopost']), HTTP_IF_NONE_MATCH='"abc"')
+        self.assertEqual(response.status_code, 404)
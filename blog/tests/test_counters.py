@@ -0,0 +1,126 @@
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from blog.counters import ViewCounter, post_views
+from blog.models import Post, PostViewCount
+
+from unittest import mock
+import threading
+import time
+
+@override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=10, BLOG_VIEW_COUNT_MAX_PENDING=100)
+class TestViewCounter(TestCase):
+    def setUp(self):
+        post_views.flush()
+        cache.clear()
+        self.user = User.objects.create(username='testUser')
+        self.posts = [Post.objects.create(title=f'test Post {i}', content='test Post content', author=self.user)
+            for i in range(3)]
+
+    def _counts(self):
+        return dict(PostViewCount.objects.values_list('post__slug', 'count'))
+
+    def test_flush_adds_to_stored_counts(self):
+        counter = ViewCounter()
+        for slug in ['test_Post_0', 'test_Post_0', 'test_Post_1', 'nopost']:
+            counter.record(slug)
+        self.assertEqual(PostViewCount.objects.count(), 0)
+        self.assertEqual(counter.flush(), 2)
+        counter.record('test_Post_0')
+        counter.flush()
+        self.assertEqual(self._counts(), {'test_Post_0': 3, 'test_Post_1': 1})
+        self.assertEqual(counter.pending(), {})
+
+    def test_processes_flush_concurrently(self):
+        """ each process adds its own views, none overwrites another's """
+        first, second = ViewCounter(), ViewCounter()
+        first.record('test_Post_0')
+        second.record('test_Post_0')
+        second.record('test_Post_0')
+        first.flush()
+        second.flush()
+        self.assertEqual(self._counts(), {'test_Post_0': 3})
+
+    def test_flush_on_interval(self):
+        counter = ViewCounter()
+        now = time.monotonic()
+        with mock.patch('blog.counters.time.monotonic', return_value=now + 5):
+            counter.record('test_Post_0')
+        self.assertEqual(self._counts(), {})
+        with mock.patch('blog.counters.time.monotonic', return_value=now + 10):
+            counter.record('test_Post_0')
+        self.assertEqual(self._counts(), {'test_Post_0': 2})
+
+    @override_settings(BLOG_VIEW_COUNT_MAX_PENDING=2)
+    def test_flush_on_pending_posts(self):
+        counter = ViewCounter()
+        for slug in ['test_Post_0', 'test_Post_1', 'test_Post_0']:
+            counter.record(slug)
+        self.assertEqual(self._counts(), {})
+        counter.record('test_Post_2')
+        self.assertEqual(self._counts(), {'test_Post_0': 2, 'test_Post_1': 1, 'test_Post_2': 1})
+
+    def test_failed_flush_keeps_views(self):
+        counter = ViewCounter()
+        counter.record('test_Post_0')
+        with mock.patch('blog.counters.PostViewCount.objects.bulk_create', side_effect=Exception('locked')), \
+                self.assertLogs('blog.counters', 'ERROR'):
+            self.assertEqual(counter.flush(), 0)
+        self.assertEqual(counter.pending(), {'test_Post_0': 1})
+
+    def test_concurrent_records_not_lost(self):
+        counter = ViewCounter()
+
+        def read():
+            for i in range(1000):
+                counter.record(f'test_Post_{i % 3}')
+
+        with override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=60 * 60):
+            threads = [threading.Thread(target=read) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sum(counter.pending().values()), 8000)
+
+    def test_write_rate_bounded(self):
+        """ over the same minute, a hundred times more reads cause the same number of writes """
+        def writes(reads):
+            counter = ViewCounter()
+            start = time.monotonic()
+            now = start
+            with CaptureQueriesContext(connection) as ctx, mock.patch('blog.counters.time.monotonic', lambda: now):
+                for i in range(reads):
+                    # reads spread evenly over one simulated minute
+                    now = start + 60 * i / reads
+                    counter.record(f'test_Post_{i % 3}')
+                counter.flush()
+            return len([q for q in ctx.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE'))])
+
+        # a flush every 10 seconds and the final one, each an INSERT of missing rows and one UPDATE
+        self.assertEqual(writes(600), 2 * 6)
+        self.assertEqual(writes(60000), 2 * 6)
+        self.assertEqual(self._counts()['test_Post_0'], 20200)
+
+    def test_post_pages_counted(self):
+        url = reverse('blog-post_detail', args=[self.posts[0].slug])
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.client.get(reverse('blog-post_detail', args=['nopost']))
+        self.client.get(reverse('blog-home'))
+        self.assertEqual(post_views.pending(), {'test_Post_0': 3})
+
+    def test_most_read(self):
+        for slug, views in [('test_Post_0', 1), ('test_Post_2', 5)]:
+            for _ in range(views):
+                post_views.record(slug)
+        post_views.flush()
+        response = self.client.get(reverse('blog-most_read'))
+        self.assertEqual([post.title for post in response.context['posts']], ['test Post 2', 'test Post 0'])
+        self.assertContains(response, '5 views')
+        self.assertContains(response, '1 view<')
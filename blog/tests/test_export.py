@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.test import Client, TestCase, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from blog.models import Post
+
+import io
+import json
+
+@override_settings(EXPORT_TOKEN='export-token')
+class TestExport(TestCase):
+    def setUp(self):
+        self.client = Client(HTTP_AUTHORIZATION='Bearer export-token')
+        self.user = User.objects.create(username='testUser')
+        self.old_post = Post.objects.create(title='old Post', content='old Post content', author=self.user)
+        self.new_post = Post.objects.create(title='new Post', content='new Post content', author=self.user)
+        self.since = timezone.now() - timedelta(days=1)
+        Post.objects.filter(pk=self.old_post.pk).update(updated_at=self.since - timedelta(days=1))
+        self.url = reverse('blog-export_posts')
+
+    def _lines(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = self._lines(response)
+        self.assertEqual([row['title'] for row in rows], ['old Post', 'new Post'])
+        self.assertEqual(rows[1]['author'], 'testUser')
+        self.assertEqual(rows[1]['content'], 'new Post content')
+        self.assertEqual(rows[1]['slug'], 'new_Post')
+        self.assertEqual(set(rows[1]), {'id', 'title', 'slug', 'content', 'date_posted', 'updated_at', 'author'})
+
+    def test_json_array(self):
+        response = self.client.get(self.url, {'format': 'json'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['title'] for row in rows], ['old Post', 'new Post'])
+
+    def test_empty_json_array(self):
+        Post.objects.all().delete()
+        response = self.client.get(self.url, {'format': 'json'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+    def test_since(self):
+        rows = self._lines(self.client.get(self.url, {'since': self.since.isoformat()}))
+        self.assertEqual([row['title'] for row in rows], ['new Post'])
+        rows = self._lines(self.client.get(self.url, {'since': (self.since - timedelta(days=1)).date().isoformat()}))
+        self.assertEqual(len(rows), 2)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+        self.assertEqual(self.client.head(self.url).status_code, 200)
+
+    def test_requires_token_or_staff(self):
+        self.assertEqual(Client().get(self.url).status_code, 404)
+        self.assertEqual(Client(HTTP_AUTHORIZATION='Bearer wrong').get(self.url).status_code, 404)
+        client = Client()
+        client.force_login(self.user)
+        self.assertEqual(client.get(self.url).status_code, 404)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(len(self._lines(client.get(self.url))), 2)
+        with override_settings(EXPORT_TOKEN=None):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_single_query_per_chunk(self):
+        for i in range(5):
+            Post.objects.create(title=f'test Post {i}', content='test Post content', author=self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self._lines(self.client.get(self.url))), 7)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_posts', since=self.since.isoformat(), stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['new Post'])
+
+    def test_command_invalid_since(self):
+        with self.assertRaises(CommandError):
+            call_command('export_posts', since='yesterday', stdout=io.StringIO())
@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.http import http_date
+
+from blog.models import Post
+
+import datetime
+import time
+
+class TestFeeds(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='testUser')
+        self.other = User.objects.create(username='otherUser')
+        self.post = Post.objects.create(title='test Post', content='test Post content', author=self.user)
+        Post.objects.create(title='other Post', content='other Post content', author=self.other)
+
+    def test_rss_feed(self):
+        response = self.client.get(reverse('blog-feed_rss'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertContains(response, '<title>test Post</title>')
+        self.assertContains(response, '<title>other Post</title>')
+        self.assertContains(response, self.post.get_absolute_url())
+
+    def test_atom_feed(self):
+        response = self.client.get(reverse('blog-feed_atom'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/atom+xml'))
+        self.assertContains(response, '<updated>')
+        self.assertContains(response, 'test Post content')
+
+    def test_user_feed(self):
+        for name in ['blog-user_feed_rss', 'blog-user_feed_atom']:
+            response = self.client.get(reverse(name, args=[self.user]))
+            self.assertContains(response, '<title>test Post</title>')
+            self.assertNotContains(response, 'other Post')
+
+    def test_user_feed_unknown_user(self):
+        response = self.client.get(reverse('blog-user_feed_rss', args=['nouser']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_cached(self):
+        url = reverse('blog-feed_rss')
+        content = self.client.get(url).content
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, content)
+
+    def test_post_change_invalidates(self):
+        url = reverse('blog-feed_atom')
+        user_url = reverse('blog-user_feed_atom', args=[self.user])
+        self.client.get(url)
+        self.client.get(user_url)
+        self.post.title = 'test Post Updated'
+        self.post.save()
+        self.assertContains(self.client.get(url), 'test Post Updated')
+        self.assertContains(self.client.get(user_url), 'test Post Updated')
+
+    def test_other_author_post_keeps_user_feed(self):
+        url = reverse('blog-user_feed_rss', args=[self.user])
+        self.client.get(url)
+        Post.objects.create(title='other Post1', content='other Post1 content', author=self.other)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_not_modified(self):
+        url = reverse('blog-feed_rss')
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.post.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_delete_not_hidden_by_last_modified(self):
+        url = reverse('blog-feed_rss')
+        older = Post.objects.create(title='older Post', content='older Post content', author=self.user)
+        Post.objects.filter(pk=older.pk).update(date_posted=self.post.date_posted - datetime.timedelta(days=1),
+            updated_at=self.post.updated_at - datetime.timedelta(days=1))
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        older.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'older Post')
@@ -0,0 +1,143 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from blog.cache import feed_version, posts_version
+from blog.importer import PostImporter, read_json_array
+from blog.models import Post
+from blog.search import get_search_backend
+
+import io
+import json
+import os
+import tempfile
+
+class TestImport(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='testUser')
+        self.other = User.objects.create(username='otherUser')
+
+    def _rows(self, count, author='testUser', start=0):
+        return [{'title': f'import Post {i}', 'content': f'import Post {i} content', 'author': author}
+            for i in range(start, start + count)]
+
+    def _call(self, content, suffix='.ndjson', **options):
+        file = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_posts', file.name, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_batches(self):
+        rows = self._rows(3) + self._rows(3, author='otherUser', start=3)
+        importer = PostImporter(batch_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            list(importer.run(rows))
+        self.assertEqual(importer.imported, 6)
+        sql = [query['sql'] for query in queries]
+        self.assertEqual(len([query for query in sql if query.startswith('INSERT INTO "blog_post"')]), 3)
+        self.assertEqual(len([query for query in sql if 'FROM "auth_user"' in query]), 2)
+        post = Post.objects.get(title='import Post 3')
+        self.assertEqual(post.slug, 'import_Post_3')
+        self.assertEqual(post.content_html, '<p>import Post 3 content</p>')
+        self.assertEqual(post.excerpt, '<p>import Post 3 content</p>')
+        self.assertEqual(Post.objects.get(title='import Post 4').author, self.other)
+
+    def test_import_indexes_and_invalidates(self):
+        versions = [feed_version(), posts_version(self.user.pk)]
+        list(PostImporter().run(self._rows(3)))
+        self.assertEqual(len(get_search_backend().search('import')[:10]), 3)
+        self.assertNotEqual([feed_version(), posts_version(self.user.pk)], versions)
+
+    def test_skips_invalid_rows(self):
+        Post.objects.create(title='import Post 0', content='existing', author=self.user)
+        skipped = []
+        rows = self._rows(3) + [
+            {'title': 'import Post 1', 'content': 'duplicate in batch', 'author': 'testUser'},
+            {'title': 'no author', 'content': 'content', 'author': 'nobody'},
+            {'title': 'no content', 'author': 'testUser'},
+            {'title': 'x' * 61, 'content': 'content', 'author': 'testUser'},
+            {'title': 'bad date', 'content': 'content', 'author': 'testUser', 'date_posted': 'yesterday'},
+        ]
+        importer = PostImporter(on_skip=lambda number, reason: skipped.append(number))
+        list(importer.run(rows))
+        self.assertEqual((importer.imported, importer.skipped), (2, 6))
+        self.assertEqual(skipped, [6, 7, 8, 1, 4, 5])
+        self.assertEqual(Post.objects.get(title='import Post 1').content, 'import Post 1 content')
+
+    def test_slug_collisions(self):
+        Post.objects.create(title='slug post', content='content', author=self.user)
+        Post.objects.create(title='slug_post 2', content='content', author=self.user)
+        rows = [{'title': title, 'content': 'content', 'author': 'testUser'} for title in ['slug_post', 'slug post_2']]
+        list(PostImporter().run(rows))
+        self.assertEqual(Post.objects.get(title='slug_post').slug, 'slug_post_3')
+        self.assertEqual(Post.objects.get(title='slug post_2').slug, 'slug_post_2_2')
+
+    def test_suffixed_slug_kept_on_edit(self):
+        Post.objects.create(title='a b', content='content', author=self.user)
+        list(PostImporter().run([{'title': 'a_b', 'content': 'content', 'author': 'testUser'}]))
+        post = Post.objects.get(title='a_b')
+        self.assertEqual(post.slug, 'a_b_2')
+        post.content = 'edited'
+        post.save()
+        self.assertEqual(Post.objects.get(title='a_b').slug, 'a_b_2')
+
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('blog-post_update', args=['a_b_2']),
+            {'title': 'a_b', 'content': 'edited again'})
+        self.assertRedirects(response, reverse('blog-post_detail', args=['a_b_2']))
+        self.assertEqual(Post.objects.get(slug='a_b_2').content, 'edited again')
+
+        post.title = 'a b c'
+        post.save()
+        self.assertEqual(post.slug, 'a_b_c')
+        post.title = 'a_b'
+        post.save()
+        self.assertEqual(post.slug, 'a_b_2')
+
+    def test_date_posted(self):
+        list(PostImporter().run([dict(self._rows(1)[0], date_posted='2020-05-01T12:00:00+00:00')]))
+        self.assertEqual(Post.objects.get().date_posted.isoformat(), '2020-05-01T12:00:00+00:00')
+
+    def test_read_json_array(self):
+        rows = self._rows(50)
+        text = json.dumps(rows, indent=2)
+        self.assertEqual(list(read_json_array(io.StringIO(text), read_size=7)), rows)
+        self.assertEqual(list(read_json_array(io.StringIO(' [ ] '))), [])
+        with self.assertRaises(ValueError):
+            list(read_json_array(io.StringIO('{"title": "x"}')))
+        with self.assertRaises(ValueError):
+            list(read_json_array(io.StringIO('[{"title": "x"} {"title": "y"}]')))
+
+    def test_command_formats(self):
+        out, err = self._call(''.join(json.dumps(row) + '\n' for row in self._rows(2)))
+        self.assertIn('Imported 2 post(s), skipped 0', out)
+        self._call(json.dumps(self._rows(3)[2:]), suffix='.json')
+        out, err = self._call('title,content,author\nimport Post 3,csv content,otherUser\nimport Post 4,,testUser\n',
+            suffix='.csv')
+        self.assertIn('Imported 1 post(s), skipped 1', out)
+        self.assertIn('Skipped row 2', err)
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(Post.objects.get(title='import Post 3').author, self.other)
+
+    def test_command_round_trip_export(self):
+        Post.objects.create(title='export Post', content='export Post content', author=self.user)
+        out = io.StringIO()
+        call_command('export_posts', stdout=out)
+        Post.objects.all().delete()
+        self._call(out.getvalue())
+        self.assertEqual(Post.objects.get().content, 'export Post content')
+
+    def test_command_invalid_input(self):
+        with self.assertRaises(CommandError):
+            self._call('{not json')
+        with self.assertRaises(CommandError):
+            call_command('import_posts', '/nonexistent/posts.ndjson', stdout=io.StringIO())
@@ -0,0 +1,37 @@
+from django.test import SimpleTestCase, override_settings
+from django.template import Context, Template
+from django.urls import clear_script_prefix, path, reverse, set_script_prefix
+
+from blog.links import cached_reverse
+from blog.views import about
+
+urlpatterns = [
+    path('other/about/', about, name='blog-about'),
+]
+
+class TestCachedReverse(SimpleTestCase):
+    def test_matches_reverse(self):
+        self.assertEqual(cached_reverse('blog-home'), reverse('blog-home'))
+        self.assertEqual(cached_reverse('blog-post_detail', 'test_Post'), reverse('blog-post_detail',
+            args=['test_Post']))
+        self.assertEqual(cached_reverse('blog-archive_month', 2020, 1), '/archive/2020/1/')
+
+    def test_per_script_prefix(self):
+        cached_reverse('blog-about')
+        set_script_prefix('/blog/')
+        try:
+            self.assertEqual(cached_reverse('blog-about'), '/blog/about/')
+        finally:
+            clear_script_prefix()
+        self.assertEqual(cached_reverse('blog-about'), '/about/')
+
+    def test_cleared_when_urlconf_changes(self):
+        cached_reverse('blog-about')
+        with override_settings(ROOT_URLCONF=__name__):
+            self.assertEqual(cached_reverse('blog-about'), '/other/about/')
+        self.assertEqual(cached_reverse('blog-about'), '/about/')
+
+    def test_cached_url_tag(self):
+        template = Template("{% load link_tags %}{% cached_url 'blog-home' %} {% cached_url 'blog-user_posts' name %}")
+        # escaped like the output of {% url %}
+        self.assertEqual(template.render(Context({'name': 'a&b'})), '/ /a&amp;b/')
@@ -0,0 +1,141 @@
+from django.test import TestCase, AsyncRequestFactory, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from blog.counters import post_views
+from blog.middleware import LOCK_KEY, PAGE_KEY, AnonymousPageCacheMiddleware
+from blog.models import Post
+from blog.sidebar import sidebar_data
+from user.models import Profile
+
+from unittest import mock
+import asyncio
+import hashlib
+import time
+
+class TestAnonymousPageCache(TestCase):
+    def setUp(self):
+        # no view count flush may land in a counted request
+        post_views.flush()
+        cache.clear()
+        self.user = User.objects.create_user(username='testUser', password='testPassword1')
+        self.post = Post.objects.create(title='test Post', content='test Post content', author=self.user)
+        self.urls = [
+            reverse('blog-home'),
+            reverse('blog-user_posts', args=[self.user]),
+            reverse('blog-post_detail', args=[self.post.slug]),
+        ]
+
+    def _key_hash(self, url):
+        return hashlib.md5(f'testserver{url}'.encode()).hexdigest()
+
+    def test_hit(self):
+        for url in self.urls:
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response['X-Page-Cache'], 'hit')
+            self.assertContains(response, 'test Post')
+
+    def test_keyed_by_query(self):
+        self.client.get(self.urls[0])
+        self.assertEqual(self.client.get(self.urls[0] + '?page=1')['X-Page-Cache'], 'miss')
+
+    def test_bypassed(self):
+        self.client.get(self.urls[0])
+        self.assertFalse(self.client.post(self.urls[0]).has_header('X-Page-Cache'))
+        self.assertFalse(self.client.get(reverse('blog-about')).has_header('X-Page-Cache'))
+        self.assertFalse(self.client.get(reverse('blog-search'), {'q': 'test'}).has_header('X-Page-Cache'))
+        self.client.login(username='testUser', password='testPassword1')
+        response = self.client.get(self.urls[0])
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'Logout')
+
+    def test_not_found_not_cached(self):
+        url = reverse('blog-post_detail', args=['nopost'])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertIsNone(cache.get(PAGE_KEY.format(self._key_hash(url))))
+
+    def test_post_change_serves_stale_while_one_request_regenerates(self):
+        url = self.urls[2]
+        self.client.get(url)
+        self.post.content = 'test Post content Updated'
+        self.post.save()
+        # another request is already regenerating the page
+        cache.add(LOCK_KEY.format(self._key_hash(url)), True)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        self.assertNotContains(response, 'Updated')
+        cache.delete(LOCK_KEY.format(self._key_hash(url)))
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Updated')
+        self.assertIsNone(cache.get(LOCK_KEY.format(self._key_hash(url))))
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+
+    def test_deleted_post_page_dropped(self):
+        url = self.urls[2]
+        self.client.get(url)
+        self.post.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_avatar_change_invalidates(self):
+        self.client.get(self.urls[0])
+        Profile.objects.filter(user=self.user).update(img_hash='abcdef0123456789')
+        profile = Profile.objects.get(user=self.user)
+        profile.img_hash = '0123456789abcdef'
+        profile.save()
+        self.assertContains(self.client.get(self.urls[0]), '0123456789abcdef-65.jpg')
+
+    def test_rename_invalidates(self):
+        for url in self.urls:
+            self.client.get(url)
+        sidebar_data()
+        self.user.username = 'renamedUser'
+        self.user.save()
+        for url in (self.urls[0], self.urls[2]):
+            response = self.client.get(url)
+            self.assertContains(response, reverse('blog-user_posts', args=['renamedUser']))
+            self.assertNotContains(response, reverse('blog-user_posts', args=['testUser']))
+        self.assertEqual(self.client.get(reverse('blog-user_posts', args=['renamedUser'])).status_code, 200)
+        self.assertEqual(self.client.get(self.urls[1]).status_code, 404)
+        self.assertEqual([author['username'] for author in sidebar_data()['top_authors']], ['renamedUser'])
+
+    def test_login_keeps_pages(self):
+        self.client.get(self.urls[0])
+        self.client.login(username='testUser', password='testPassword1')
+        self.client.logout()
+        self.assertEqual(self.client.get(self.urls[0])['X-Page-Cache'], 'hit')
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=10)
+    def test_expired_page_regenerated(self):
+        self.client.get(self.urls[0])
+        with mock.patch('blog.middleware.time.time', return_value=time.time() + 20):
+            self.assertEqual(self.client.get(self.urls[0])['X-Page-Cache'], 'miss')
+
+    def test_not_modified(self):
+        etag = self.client.get(self.urls[2])['ETag']
+        response = self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(response['ETag'], etag)
+
+    async def test_async(self):
+        calls = []
+
+        async def get_response(request):
+            calls.append(request)
+            return HttpResponse('test page')
+
+        middleware = AnonymousPageCacheMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        factory = AsyncRequestFactory()
+        first = await middleware(factory.get('/'))
+        second = await middleware(factory.get('/'))
+        self.assertEqual((first['X-Page-Cache'], second['X-Page-Cache']), ('miss', 'hit'))
+        self.assertEqual(second.content, b'test page')
+        self.assertEqual(len(calls), 1)
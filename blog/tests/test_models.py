@@ -0,0 +1,27 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from blog.models import Post
+
+class TestPost(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testUser')
+
+    def test_save_renders_content(self):
+        post = Post.objects.create(title='test Post', content='first line\nsecond <b>line</b>\n\nnext paragraph',
+            author=self.user)
+        self.assertEqual(post.content_html,
+            '<p>first line<br>second &lt;b&gt;line&lt;/b&gt;</p>\n\n<p>next paragraph</p>')
+        self.assertEqual(post.excerpt, post.content_html)
+
+    def test_save_truncates_excerpt(self):
+        post = Post.objects.create(title='test Post', content=' '.join(['word'] * 150), author=self.user)
+        self.assertEqual(post.excerpt, '<p>' + ' '.join(['word'] * 100) + ' …</p>')
+
+    def test_save_rerenders_on_update(self):
+        post = Post.objects.create(title='test Post', content='old content', author=self.user)
+        post.content = 'new content'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>new content</p>')
+        self.assertEqual(post.excerpt, '<p>new content</p>')
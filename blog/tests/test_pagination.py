@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from blog.models import Post
+from blog.pagination import CursorPaginator, InvalidCursor
+
+class TestCursorPaginator(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testUser')
+        now = timezone.now()
+        # pairs of posts share date_posted so the id tie-breaker is exercised
+        for i in range(7):
+            Post.objects.create(title=f'test Post {i}', content='test Post content', author=self.user,
+                date_posted=now - timedelta(minutes=i // 2))
+        self.expected = list(Post.objects.order_by('-date_posted', 'id'))
+        self.paginator = CursorPaginator(Post.objects.all(), 3)
+
+    def test_walk_forward_and_back(self):
+        first = self.paginator.page()
+        self.assertEqual(list(first), self.expected[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = self.paginator.page(first.next_cursor)
+        self.assertEqual(list(second), self.expected[3:6])
+        self.assertTrue(second.has_previous())
+
+        third = self.paginator.page(second.next_cursor)
+        self.assertEqual(list(third), self.expected[6:])
+        self.assertFalse(third.has_next())
+        self.assertIsNone(third.next_cursor)
+
+        back = self.paginator.page(third.previous_cursor)
+        self.assertEqual(list(back), self.expected[3:6])
+        self.assertTrue(back.has_next())
+
+        back = self.paginator.page(back.previous_cursor)
+        self.assertEqual(list(back), self.expected[:3])
+        self.assertFalse(back.has_previous())
+
+    def test_page_does_not_count(self):
+        """ fetching a deep page runs a single query and no COUNT(*) """
+        cursor = self.paginator.page().next_cursor
+        with self.assertNumQueries(1) as ctx:
+            self.paginator.page(cursor).object_list
+        self.assertNotIn('COUNT', ctx.captured_queries[0]['sql'].upper())
+
+    def test_tampered_cursor(self):
+        cursor = self.paginator.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            self.paginator.page(cursor[:-2] + 'xx')
+        with self.assertRaises(InvalidCursor):
+            self.paginator.page('garbage')
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+class TestCursorPaginationViews(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testUser')
+        for i in range(12):
+            Post.objects.create(title=f'test Post {i}', content='test Post content', author=self.user)
+
+    def test_post_list_GET(self):
+        response = self.client.get(reverse('blog-home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(len(response.context['posts']), 10)
+        cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, 'cursor=')
+
+        response = self.client.get(reverse('blog-home'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['posts']), 2)
+
+    def test_user_post_list_GET(self):
+        response = self.client.get(reverse('blog-user_posts', args=[self.user]))
+        self.assertEqual(response.status_code, 200)
+        cursor = response.context['page_obj'].next_cursor
+        response = self.client.get(reverse('blog-user_posts', args=[self.user]), {'cursor': cursor})
+        self.assertEqual(len(response.context['posts']), 2)
+
+    def test_post_list_GET_invalid_cursor(self):
+        """ PostListView throws 404 if given cursor is invalid """
+        response = self.client.get(reverse('blog-home'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,87 @@
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from blog.models import Post
+from blog.search import get_search_backend, SimpleBackend, FTS_TABLE
+
+import io
+
+class TestSearch(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testUser')
+        self.django_post = Post.objects.create(title='Django tips', content='Views and templates', author=self.user)
+        self.python_post = Post.objects.create(title='Python', content='Writing django views in python',
+            author=self.user)
+        Post.objects.create(title='Cooking', content='Pasta recipes', author=self.user)
+        self.url = reverse('blog-search')
+
+    def _titles(self, query):
+        return [post.title for post in get_search_backend().search(query)[:10]]
+
+    def test_ranked_by_title_weight(self):
+        self.assertEqual(self._titles('django'), ['Django tips', 'Python'])
+
+    def test_stemming_and_all_terms(self):
+        self.assertEqual(self._titles('view'), ['Django tips', 'Python'])
+        self.assertEqual(self._titles('django python'), ['Python'])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self._titles('"django" OR NEAR(*'), [])
+        self.assertEqual(get_search_backend().search('***'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.django_post.title = 'Flask tips'
+        self.django_post.content = 'Blueprints'
+        self.django_post.save()
+        self.assertEqual(self._titles('django'), ['Python'])
+        self.assertEqual(self._titles('flask'), ['Flask tips'])
+        self.python_post.delete()
+        self.assertEqual(self._titles('django'), [])
+
+    def test_uses_index(self):
+        """ search matches against the FTS index, not with a scan of blog_post """
+        results = get_search_backend().search('django')
+        with self.assertNumQueries(3) as ctx:
+            results.count()
+            results[0:10]
+        self.assertIn(FTS_TABLE, ctx.captured_queries[0]['sql'])
+        self.assertIn(FTS_TABLE, ctx.captured_queries[1]['sql'])
+        self.assertNotIn('LIKE', ' '.join(q['sql'] for q in ctx.captured_queries))
+
+    def test_search_GET(self):
+        response = self.client.get(self.url, {'q': 'django'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'blog/search.html')
+        self.assertEqual(list(response.context['posts']), [self.django_post, self.python_post])
+        self.assertContains(response, 'Results for "django" (2)')
+
+    def test_search_GET_no_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['posts']), [])
+
+    def test_search_GET_paginated(self):
+        for i in range(12):
+            Post.objects.create(title=f'paged {i}', content='paged content', author=self.user)
+        response = self.client.get(self.url, {'q': 'paged'})
+        self.assertEqual(len(response.context['posts']), 10)
+        self.assertContains(response, 'href="?q=paged&amp;page=2"')
+        response = self.client.get(self.url, {'q': 'paged', 'page': 2})
+        self.assertEqual(len(response.context['posts']), 2)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self._titles('django'), [])
+        out = io.StringIO()
+        call_command('rebuild_search_index', batch_size=2, stdout=out)
+        self.assertIn('Indexed 3 post(s)', out.getvalue())
+        self.assertEqual(self._titles('django'), ['Django tips', 'Python'])
+
+    @override_settings(BLOG_SEARCH_BACKEND='blog.search.SimpleBackend')
+    def test_pluggable_backend(self):
+        self.assertIsInstance(get_search_backend(), SimpleBackend)
+        self.assertEqual(sorted(self._titles('django')), ['Django tips', 'Python'])
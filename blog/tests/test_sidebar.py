@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from blog.models import Post
+from blog.sidebar import sidebar_data
+
+import datetime
+
+class TestSidebar(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='testUser')
+        self.other = User.objects.create(username='otherUser')
+
+    def _date(self, year, month):
+        return timezone.make_aware(datetime.datetime(year, month, 15, 12))
+
+    def _post(self, title, author=None, date_posted=None):
+        return Post.objects.create(title=title, content='test Post content', author=author or self.user,
+            date_posted=date_posted or self._date(2020, 1))
+
+    def test_sidebar_data_cached_until_posts_change(self):
+        self._post('test Post 1')
+        with self.assertNumQueries(3):
+            data = sidebar_data()
+        self.assertEqual(data['recent_posts'], [{'title': 'test Post 1', 'slug': 'test_Post_1'}])
+        self.assertEqual(data['top_authors'], [{'post_count': 1, 'username': 'testUser'}])
+        with self.assertNumQueries(0):
+            sidebar_data()
+
+        self._post('test Post 2', author=self.other)
+        self.assertEqual(len(sidebar_data()['recent_posts']), 2)
+
+    def test_sidebar_rendered(self):
+        self._post('test Post 1')
+        response = self.client.get(reverse('blog-about'))
+        self.assertContains(response, reverse('blog-post_detail', args=['test_Post_1']))
+        self.assertContains(response, reverse('blog-archive_month', args=[2020, 1]))
+        self.assertContains(response, 'January 2020')
+
+    def test_archive_month(self):
+        self._post('test Post 1')
+        self._post('test Post 2', date_posted=self._date(2020, 2))
+        response = self.client.get(reverse('blog-archive_month', args=[2020, 1]))
+        self.assertEqual([post.title for post in response.context['posts']], ['test Post 1'])
+        self.assertEqual(self.client.get(reverse('blog-archive_month', args=[2020, 13])).status_code, 404)
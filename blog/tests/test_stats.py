@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from blog.importer import PostImporter
+from blog.models import ArchiveMonth, Post
+from blog.stats import rebuild_post_stats
+from user.models import Profile
+
+import datetime
+import io
+
+class TestPostStats(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='testUser')
+        self.other = User.objects.create(username='otherUser')
+
+    def _date(self, year, month):
+        return timezone.make_aware(datetime.datetime(year, month, 15, 12))
+
+    def _post(self, title, author=None, date_posted=None):
+        return Post.objects.create(title=title, content='test Post content', author=author or self.user,
+            date_posted=date_posted or self._date(2020, 1))
+
+    def _stats(self):
+        return (dict(Profile.objects.filter(post_count__gt=0).values_list('user__username', 'post_count')),
+            dict(ArchiveMonth.objects.filter(post_count__gt=0).values_list('month', 'post_count')))
+
+    def test_counts_follow_saves_and_deletes(self):
+        first = self._post('test Post 1')
+        self._post('test Post 2', date_posted=self._date(2020, 2))
+        self._post('test Post 3', author=self.other)
+        self.assertEqual(self._stats(), ({'testUser': 2, 'otherUser': 1},
+            {datetime.date(2020, 1, 1): 2, datetime.date(2020, 2, 1): 1}))
+
+        first.author = self.other
+        first.date_posted = self._date(2020, 3)
+        first.save()
+        self.assertEqual(self._stats(), ({'testUser': 1, 'otherUser': 2},
+            {datetime.date(2020, 1, 1): 1, datetime.date(2020, 2, 1): 1, datetime.date(2020, 3, 1): 1}))
+
+        Post.objects.get(title='test Post 1').delete()
+        self.assertEqual(self._stats(), ({'testUser': 1, 'otherUser': 1},
+            {datetime.date(2020, 1, 1): 1, datetime.date(2020, 2, 1): 1}))
+
+    def test_unmoved_save_writes_no_stats(self):
+        post = self._post('test Post 1')
+        post.content = 'new content'
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        self.assertFalse([query for query in queries if 'user_profile' in query['sql']
+            or 'blog_archivemonth' in query['sql']])
+
+    def test_stale_profile_save_keeps_post_count(self):
+        profile = Profile.objects.get(user=self.user)
+        self._post('test Post 1')
+        profile.save()
+        self.assertEqual(Profile.objects.get(user=self.user).post_count, 1)
+
+    def test_import_counts_posts(self):
+        rows = [{'title': f'import Post {i}', 'content': 'content', 'author': 'otherUser',
+            'date_posted': '2021-05-01T12:00:00+00:00'} for i in range(3)]
+        list(PostImporter().run(rows))
+        self.assertEqual(self._stats(), ({'otherUser': 3}, {datetime.date(2021, 5, 1): 3}))
+
+    def test_rebuild(self):
+        self._post('test Post 1')
+        self._post('test Post 2', author=self.other, date_posted=self._date(2019, 12))
+        Profile.objects.filter(user=self.user).update(post_count=7)
+        ArchiveMonth.objects.all().delete()
+        self.assertEqual(rebuild_post_stats(), (1, 2))
+        self.assertEqual(self._stats(), ({'testUser': 1, 'otherUser': 1},
+            {datetime.date(2020, 1, 1): 1, datetime.date(2019, 12, 1): 1}))
+
+        out = io.StringIO()
+        call_command('rebuild_post_stats', stdout=out)
+        self.assertIn('Corrected 0 profile post count(s) and counted 2 archive month(s)', out.getvalue())
+
+    def test_user_posts_paginated_without_count(self):
+        for i in range(12):
+            self._post(f'test Post {i}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog-user_posts', args=['testUser']), {'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 2)
+        self.assertEqual(len(response.context['posts']), 2)
+        self.assertContains(response, 'Posts by testUser (12)')
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
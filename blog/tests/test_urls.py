@@ -1,8 +1,9 @@
 from django.test import SimpleTestCase
 from django.urls import reverse, resolve
 
+from blog.feeds import LatestPostsFeed, LatestPostsAtomFeed, UserPostsFeed, UserPostsAtomFeed
 from blog.views import (PostListView, UserPostListView, PostCreateView, PostDetailView, PostUpdateView, PostDeleteView,
-                        about)
+                        PostSearchView, about)
 
 class TestUrls(SimpleTestCase):
     def test_home_url_resolves(self):
@@ -32,3 +33,13 @@ class TestUrls(SimpleTestCase):
     def test_about_url_resolves(self):
         url = reverse('blog-about')
         self.assertEqual(resolve(url).func, about)
+
+    def test_search_url_resolves(self):
+        url = reverse('blog-search')
+        self.assertEqual(resolve(url).func.view_class, PostSearchView)
+
+    def test_feed_urls_resolve(self):
+        for name, feed_class in [('blog-feed_rss', LatestPostsFeed), ('blog-feed_atom', LatestPostsAtomFeed)]:
+            self.assertEqual(resolve(reverse(name)).func.feed_class, feed_class)
+        for name, feed_class in [('blog-user_feed_rss', UserPostsFeed), ('blog-user_feed_atom', UserPostsAtomFeed)]:
+            self.assertEqual(resolve(reverse(name, args=['test-username'])).func.feed_class, feed_class)
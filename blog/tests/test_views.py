@@ -1,11 +1,18 @@
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
 
+from blog.counters import post_views
 from blog.models import Post
+from blog.sidebar import sidebar_data
 
 class TestViews(TestCase):
     def setUp(self):
+        # no view count flush may land in a counted request
+        post_views.flush()
         self.client = Client()
         self.user = User.objects.create(username='testUser')
         Post.objects.create(title='test Post', content='test Post content', author=self.user)
@@ -14,6 +21,17 @@ class TestViews(TestCase):
         self.post_update_url = reverse('blog-post_update', args=[Post.objects.get(pk=1).slug])
         self.post_delete_url = reverse('blog-post_delete', args=[Post.objects.get(pk=1).slug])
 
+    def _create_posts(self, count, author=None):
+        for i in range(count):
+            user = author or User.objects.create(username=f'author{Post.objects.count()}')
+            Post.objects.create(title=f'query Post {Post.objects.count()}', content='query Post content', author=user)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
     def test_post_list_GET(self):
         url = reverse('blog-home')
         response = self.client.get(url)
@@ -26,6 +44,35 @@ class TestViews(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'blog/user_posts.html')
 
+    def test_post_list_GET_query_count(self):
+        """ PostListView query count does not grow with the number of posts on a page """
+        url = reverse('blog-home')
+        queries_one_post = self._count_queries(url)
+        self._create_posts(9)
+        with self.assertNumQueries(queries_one_post):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['posts']), 10)
+
+    def test_post_list_GET_content_deferred(self):
+        """ PostListView renders stored excerpts without loading full post bodies """
+        Post.objects.create(title='long Post', content=' '.join(['word'] * 150), author=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('blog-home'))
+        post_queries = [q['sql'] for q in ctx.captured_queries if '"blog_post"."excerpt"' in q['sql']]
+        self.assertEqual(len(post_queries), 1)
+        self.assertNotIn('"blog_post"."content"', post_queries[0])
+        self.assertContains(response, ' '.join(['word'] * 100) + ' …')
+        self.assertNotContains(response, ' '.join(['word'] * 101))
+
+    def test_user_post_list_GET_query_count(self):
+        """ UserPostListView query count does not grow with the number of posts on a page """
+        url = reverse('blog-user_posts', args=[self.user])
+        queries_one_post = self._count_queries(url)
+        self._create_posts(9, author=self.user)
+        with self.assertNumQueries(queries_one_post):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['posts']), 10)
+
     def test_user_post_list_GET_user_does_not_exist(self):
         """ UserPostListView throws 404 if user with given username does not exist """
         url = reverse('blog-user_posts', args=['testUser0'])
@@ -80,6 +127,14 @@ class TestViews(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'blog/post_detail.html')
 
+    def test_post_detail_GET_query_count(self):
+        """ PostDetailView looks up its validators, then loads post, author and profile with a single query """
+        url = reverse('blog-post_detail', args=[Post.objects.get(pk=1).slug])
+        sidebar_data()
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
     def test_post_detail_GET_post_does_not_exist(self):
         """ PostDetailView throws 404 if given post does not exist """
         url = reverse('blog-post_detail', args=['nopost'])
@@ -174,6 +229,29 @@ class TestViews(TestCase):
         response = self.client.post(url)
         self.assertEqual(response.status_code, 404)
 
+    def test_post_owner_views_query_count(self):
+        """ PostUpdateView and PostDeleteView look the post up once and never load its author """
+        self.client.force_login(self.user)
+        for url in [self.post_update_url, self.post_delete_url]:
+            # start without a cached request.user, so its query is the only one on auth_user
+            cache.clear()
+            sidebar_data()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            sql = [q['sql'] for q in ctx.captured_queries]
+            self.assertEqual(len([q for q in sql if 'FROM "blog_post"' in q]), 1, url)
+            self.assertEqual(len([q for q in sql if 'FROM "auth_user"' in q]), 1, url)
+
+    def test_post_delete_POST_query_count(self):
+        """ deleting a post selects it once before deleting it """
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.post_delete_url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('SELECT')
+            and 'FROM "blog_post"' in q['sql']]), 1)
+
     def test_about_GET(self):
         url = reverse('blog-about')
         response = self.client.get(url)
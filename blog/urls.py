@@ -1,11 +1,19 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='blog-home'),
     path('about/', views.about, name='blog-about'),
+    path('search/', views.PostSearchView.as_view(), name='blog-search'),
+    path('most-read/', views.MostReadPostListView.as_view(), name='blog-most_read'),
+    path('archive/<int:year>/<int:month>/', views.PostMonthArchiveView.as_view(), name='blog-archive_month'),
+    path('export/posts/', views.export_posts, name='blog-export_posts'),
+    path('feed/rss/', feeds.cached_feed(feeds.LatestPostsFeed), name='blog-feed_rss'),
+    path('feed/atom/', feeds.cached_feed(feeds.LatestPostsAtomFeed), name='blog-feed_atom'),
     path('<str:username>/', views.UserPostListView.as_view(), name='blog-user_posts'),
+    path('<str:username>/feed/rss/', feeds.cached_feed(feeds.UserPostsFeed), name='blog-user_feed_rss'),
+    path('<str:username>/feed/atom/', feeds.cached_feed(feeds.UserPostsAtomFeed), name='blog-user_feed_atom'),
     path('post/create/', views.PostCreateView.as_view(), name='blog-post_create'),
     path('post/<slug:slug>/', views.PostDetailView.as_view(), name='blog-post_detail'),
     path('post/<slug:slug>/update/', views.PostUpdateView.as_view(), name='blog-post_update'),
@@ -1,32 +1,197 @@
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.views.decorators.http import condition, require_safe
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
 
+from .cache import feed_version, posts_version
+from .export import FORMATS, export_rows, parse_timestamp
 from .models import Post
+from .pagination import CountedPaginator, CursorPaginator
+from .search import get_search_backend
 
-class PostListView(ListView):
+import datetime
+import hashlib
+import hmac
+
+class CursorPaginationMixin:
+    """ Opt-in keyset pagination for post lists, enabled with settings.BLOG_CURSOR_PAGINATION """
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-date_posted', 'id')
+
+    def uses_cursor_pagination(self):
+        return settings.BLOG_CURSOR_PAGINATION
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, ordering=self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = self.uses_cursor_pagination()
+        return context
+
+class FeedCacheMixin:
+    """ Provides the template with the version and page the cached article list fragment is keyed by """
+    feed_author = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if context['cursor_pagination']:
+            context['feed_page'] = self.request.GET.get(self.cursor_kwarg, '')
+        else:
+            context['feed_page'] = context['page_obj'].number
+        context['feed_version'] = feed_version(self.feed_author.pk if self.feed_author else None)
+        context['feed_cache_timeout'] = settings.BLOG_FEED_CACHE_TIMEOUT
+        return context
+
+class ConditionalGetMixin:
+    """
+    Answers GET and HEAD with 304 Not Modified before any rendering, from validators computed by
+    get_validators() with cheap queries. The ETag also covers the page's query string, the logged in
+    user and the sidebar of base.html, since all of them change the rendered page. Last-Modified is only
+    worth sending when the timestamp moves with every change of the page.
+    """
+    def get_validators(self):
+        """
+        (etag parts, last modified or None) of the requested page, or (None, None) to always render it
+        """
+        raise NotImplementedError('subclasses of ConditionalGetMixin must provide a get_validators() method')
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag_parts, last_modified = self.get_validators()
+        etag = None
+        if etag_parts is not None:
+            # posts_version() is what sidebar_data() is cached under, it changes with any author's posts
+            parts = [*etag_parts, posts_version(), request.get_full_path(), request.user.pk,
+                settings.BLOG_CURSOR_PAGINATION]
+            etag = hashlib.md5(repr(parts).encode()).hexdigest()
+        return condition(etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified)(super().dispatch)(
+            request, *args, **kwargs)
+
+class PostListView(ConditionalGetMixin, FeedCacheMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/home.html'
     context_object_name = 'posts'
     ordering = ['-date_posted']
     paginate_by = 10
 
-class UserPostListView(ListView):
+    def get_validators(self):
+        # no Last-Modified: deleting a post other than the latest changes the list but not MAX(updated_at)
+        stats = Post.objects.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+        return (stats['count'], stats['last_modified'], feed_version()), None
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('author__profile').defer('content', 'content_html')
+
+class UserPostListView(ConditionalGetMixin, FeedCacheMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/user_posts.html'
     context_object_name = 'posts'
     paginate_by = 10
 
+    def get_feed_author(self):
+        if self.feed_author is None:
+            self.feed_author = get_object_or_404(User.objects.select_related('profile'),
+                username=self.kwargs.get('username'))
+        return self.feed_author
+
+    def get_validators(self):
+        author = self.get_feed_author()
+        last_modified = Post.objects.filter(author=author).aggregate(last_modified=Max('updated_at'))['last_modified']
+        # no Last-Modified, see PostListView
+        return (author.profile.post_count, last_modified, feed_version(author.pk)), None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return CountedPaginator(queryset, per_page, self.get_feed_author().profile.post_count, **kwargs)
+
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs.get('username'))
-        return Post.objects.filter(author=user).order_by('-date_posted')
+        return (Post.objects.filter(author=self.get_feed_author()).select_related('author__profile')
+            .defer('content', 'content_html').order_by('-date_posted'))
 
-class PostDetailView(DetailView):
-    model = Post
+class PostDetailView(ConditionalGetMixin, DetailView):
+    queryset = Post.objects.select_related('author__profile').defer('content', 'excerpt')
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
 
+    def get_validators(self):
+        post = Post.objects.filter(slug=self.kwargs.get('slug')).values('updated_at', 'author_id').first()
+        if post is None:
+            return None, None
+        # no Last-Modified: the sidebar changes with other posts, whose updates post['updated_at'] misses
+        return (post['updated_at'], feed_version(post['author_id'])), None
+
+class PostSearchView(ListView):
+    template_name = 'blog/search.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return []
+        return get_search_backend().search(self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['page_query'] = urlencode({'q': self.query}) + '&'
+        context['title'] = 'Search'
+        return context
+
+class MostReadPostListView(ListView):
+    """ Posts with the most views, as counted by blog/counters.py """
+    template_name = 'blog/most_read.html'
+    context_object_name = 'posts'
+    most_read_count = 10
+
+    def get_queryset(self):
+        return (Post.objects.filter(view_count__count__gt=0).select_related('author__profile', 'view_count')
+            .defer('content', 'content_html').order_by('-view_count__count', '-date_posted')[:self.most_read_count])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = 'Most read'
+        return context
+
+class PostMonthArchiveView(ListView):
+    """ Posts of one month, linked from the sidebar archive; a range scan of the date_posted index """
+    template_name = 'blog/archive_month.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_queryset(self):
+        try:
+            self.month = datetime.date(self.kwargs['year'], self.kwargs['month'], 1)
+        except ValueError:
+            raise Http404('Invalid month')
+        next_month = (self.month + datetime.timedelta(days=31)).replace(day=1)
+        start = timezone.make_aware(datetime.datetime.combine(self.month, datetime.time()))
+        end = timezone.make_aware(datetime.datetime.combine(next_month, datetime.time()))
+        return (Post.objects.filter(date_posted__gte=start, date_posted__lt=end).select_related('author__profile')
+            .defer('content', 'content_html').order_by('-date_posted'))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['month'] = self.month
+        context['title'] = self.month.strftime('%B %Y')
+        return context
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     fields = ['title', 'content']
@@ -35,7 +200,22 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         form.instance.author = self.request.user
         return super().form_valid(form)
 
-class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class PostOwnerRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    """
+    Lets only the post's author through. The post is looked up once per request and reused by the view's
+    own get_object() calls, and ownership is checked on author_id so the author is never loaded.
+    """
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_post'):
+            self._post = super().get_object()
+        return self._post
+
+    def test_func(self):
+        return self.get_object().author_id == self.request.user.pk
+
+class PostUpdateView(PostOwnerRequiredMixin, UpdateView):
     model = Post
     fields = ['title', 'content']
 
@@ -43,23 +223,35 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         form.instance.author = self.request.user
         return super().form_valid(form)
 
-    def test_func(self):
-        post = self.get_object()
-        if self.request.user == post.author:
-            return True
-        return False
-
-class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class PostDeleteView(PostOwnerRequiredMixin, DeleteView):
     model = Post
     template_name = 'blog/post_delete.html'
     context_object_name = 'post'
     success_url = '/'
 
-    def test_func(self):
-        post = self.get_object()
-        if self.request.user == post.author:
-            return True
-        return False
-
 def about(request):
     return render(request, 'blog/about.html', {'title': 'About'})
+
+@require_safe
+def export_posts(request):
+    """
+    Every post as NDJSON (or a JSON array with ?format=json), optionally only those updated ?since a date.
+    A full export is a long stream, so it is only served to staff and to clients sending settings.EXPORT_TOKEN
+    as a bearer token.
+    """
+    token = settings.EXPORT_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = token and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    if not (authorized or request.user.is_staff):
+        raise Http404
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        return HttpResponseBadRequest(f'Unknown format, expected one of: {", ".join(FORMATS)}')
+    since = request.GET.get('since')
+    if since:
+        try:
+            since = parse_timestamp(since)
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+    content_type, serialize = FORMATS[export_format]
+    return StreamingHttpResponse(serialize(export_rows(since or None)), content_type=content_type)
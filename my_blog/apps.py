@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MyBlogConfig(AppConfig):
+    name = 'my_blog'
+
+    def ready(self):
+        import my_blog.db
+        import my_blog.metrics
@@ -0,0 +1,22 @@
+"""
+ASGI config for my_blog project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+The views are the same sync views as under WSGI: Django runs each in a worker thread through
+sync_to_async, and my_blog/handlers.py produces streaming responses off the event loop too.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
+"""
+
+import django
+
+import os
+
+from .handlers import ASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_blog.settings')
+
+# get_asgi_application(), with the handler streaming responses off the event loop
+django.setup(set_prefix=False)
+application = ASGIHandler()
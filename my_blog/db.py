@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from asgiref.sync import markcoroutinefunction
+
+import asyncio
+import contextvars
+
+REPLICA = 'replica'
+PRIMARY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+class RequestState:
+    def __init__(self, use_primary):
+        self.use_primary = use_primary
+        self.wrote = False
+
+# the current request's RequestState, None outside of requests
+_request_state = contextvars.ContextVar('request_state', default=None)
+
+def replica_enabled():
+    """ Whether a replica is configured, other than one pointing at the primary's database like test mirrors """
+    if REPLICA not in settings.DATABASES:
+        return False
+    return connections[REPLICA].settings_dict['NAME'] != connections['default'].settings_dict['NAME']
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads made while handling a safe request to the replica alias, when one is configured, and
+    everything else to default: writes, reads following a write in the same request, reads of requests
+    pinned to the primary by DatabaseRoutingMiddleware, and anything run outside of a request, such as
+    management commands and background tasks.
+    """
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state.use_primary or not replica_enabled():
+            return 'default'
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # read your own writes for the rest of the request
+            state.use_primary = state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same data, so objects from either side may be related
+        return obj1._state.db in ('default', REPLICA) and obj2._state.db in ('default', REPLICA)
+
+class DatabaseRoutingMiddleware:
+    """
+    Pins requests with unsafe methods to the primary database. A request that wrote anything also pins
+    the client's following requests, for settings.DATABASE_PRIMARY_STICKY_TIMEOUT seconds through a
+    cookie, so that e.g. the page a new post redirects to is read from the primary even when the
+    replica lags behind.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # lets Django call the instance as a coroutine function, as MiddlewareMixin does
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = self.get_state(request)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        # sync_to_async copies the context into worker threads, so they share this request's state object
+        state = self.get_state(request)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.process_response(state, response)
+
+    def get_state(self, request):
+        return RequestState(request.method not in SAFE_METHODS or PRIMARY_COOKIE in request.COOKIES)
+
+    def process_response(self, state, response):
+        if state.wrote:
+            response.set_cookie(PRIMARY_COOKIE, '1', max_age=settings.DATABASE_PRIMARY_STICKY_TIMEOUT, httponly=True,
+                samesite='Lax')
+        return response
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """ Applies settings.SQLITE_PRAGMAS to every new SQLite connection """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers import asgi
+
+import itertools
+
+def response_headers(response):
+    """ Headers and cookies of response as ASGI (name, value) byte pairs, as ASGIHandler sends them """
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode('ascii')
+        if isinstance(value, str):
+            value = value.encode('latin1')
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+    return headers
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    Django 3.2's ASGIHandler iterates streaming responses on the event loop, where the ORM queries of a
+    streamed export raise SynchronousOnlyOperation and file reads block every other connection. Here the
+    parts are produced in the request's own sync thread instead, batch_size of them per thread switch.
+    """
+    batch_size = 64
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        await send({'type': 'http.response.start', 'status': response.status_code,
+            'headers': response_headers(response)})
+        # access __iter__ and not streaming_content, like ASGIHandler, in case a subclass overrides it
+        parts = iter(response)
+        next_batch = sync_to_async(lambda: list(itertools.islice(parts, self.batch_size)), thread_sensitive=True)
+        while True:
+            batch = await next_batch()
+            for part in batch:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if len(batch) < self.batch_size:
+                break
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
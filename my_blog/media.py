@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+import mimetypes
+import os
+import re
+import urllib.parse
+
+from user.avatars import DERIVED_DIR
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SENDFILE_HEADERS = (None, 'X-Sendfile', 'X-Accel-Redirect')
+# derivatives are named after a hash of their content, see user/avatars.py
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CACHE_CONTROL = 'public, max-age=60'
+
+class FileRange:
+    """
+    Reads at most length bytes of file from its current position. Having no fileno(), it is copied
+    through Python instead of handed to the server's sendfile, which would send the rest of the file.
+    """
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+def parse_range(header, size):
+    """
+    Inclusive (start, end) of a single byte range Range header, None when the header is malformed or asks
+    for several ranges, which are answered with the whole file. Raises ValueError when unsatisfiable.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        if not int(end) or not size:
+            raise ValueError(header)
+        return max(0, size - int(end)), size - 1
+    start, end = int(start), int(end) if end else None
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+def if_range_passes(request, etag, last_modified):
+    """ Whether the If-Range header, if any, still matches the file """
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        # weak validators never match for ranges
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves a file of settings.MEDIA_ROOT with ETag and Last-Modified validators and single byte ranges.
+    Whole files are streamed through the server's wsgi.file_wrapper, which sends them with sendfile()
+    where supported, or left to the web server with settings.MEDIA_SENDFILE_HEADER.
+    """
+    sendfile_header = settings.MEDIA_SENDFILE_HEADER
+    if sendfile_header not in SENDFILE_HEADERS:
+        raise ImproperlyConfigured(f'MEDIA_SENDFILE_HEADER must be one of {SENDFILE_HEADERS}')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type, _ = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+        name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        if sendfile_header == 'X-Accel-Redirect':
+            # the web server answers ranges itself
+            response = HttpResponse(content_type=content_type)
+            response[sendfile_header] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + urllib.parse.quote(name)
+        elif sendfile_header == 'X-Sendfile':
+            response = HttpResponse(content_type=content_type)
+            response[sendfile_header] = full_path
+        else:
+            response = file_response(request, full_path, stat.st_size, content_type, etag, last_modified)
+            if response.status_code == 416:
+                return response
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = (IMMUTABLE_CACHE_CONTROL if path.startswith(DERIVED_DIR + '/')
+        else CACHE_CONTROL)
+    return response
+
+def file_response(request, full_path, size, content_type, etag, last_modified):
+    """ The whole file, or the byte range requested by a Range header """
+    byte_range = None
+    if request.META.get('HTTP_RANGE') and if_range_passes(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(FileRange(file, end - start + 1), content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+def media_urlpatterns():
+    """ URL pattern of serve_media under settings.MEDIA_URL, none when media are served from another host """
+    if not settings.MEDIA_URL or urllib.parse.urlsplit(settings.MEDIA_URL).netloc:
+        return []
+    prefix = re.escape(settings.MEDIA_URL.lstrip('/'))
+    return [re_path(rf'^{prefix}(?P<path>.*)$', serve_media, name='media')]
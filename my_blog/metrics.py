@@ -0,0 +1,203 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates
+from django.urls import Resolver404, resolve
+
+from asgiref.sync import markcoroutinefunction
+
+import asyncio
+import bisect
+import contextvars
+import hmac
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# any other method is reported as OTHER, so clients can not create new series at will
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+
+class Histogram:
+    """ Prometheus histogram with one series per tuple of label values, safe to observe from any thread """
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # one count per bucket plus +Inf, then the sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        """ Lines of the Prometheus text exposition format """
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for label_values, values in sorted(series.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], values):
+                cumulative += count
+                yield f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+            yield f'{self.name}_sum{{{labels}}} {values[-1]}'
+            yield f'{self.name}_count{{{labels}}} {cumulative}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+REQUEST_DURATION = Histogram('my_blog_request_duration_seconds', 'Time spent handling requests',
+    ('view', 'method'), DURATION_BUCKETS)
+DB_QUERIES = Histogram('my_blog_request_db_queries', 'SQL queries run per request', ('view',), QUERY_COUNT_BUCKETS)
+DB_DURATION = Histogram('my_blog_request_db_duration_seconds', 'Time spent in SQL queries per request', ('view',),
+    DURATION_BUCKETS)
+TEMPLATE_DURATION = Histogram('my_blog_request_template_duration_seconds',
+    'Time spent rendering templates per request', ('view',), DURATION_BUCKETS)
+HISTOGRAMS = [REQUEST_DURATION, DB_QUERIES, DB_DURATION, TEMPLATE_DURATION]
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_duration = 0.0
+        self.template_duration = 0.0
+        # nested renders, e.g. render_to_string() called from a template tag, are timed by the outer one
+        self.template_depth = 0
+
+# the current request's RequestMetrics, None outside of requests
+_request_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+def time_query(execute, sql, params, many, context):
+    """ Database execute wrapper adding each query of the current request to its metrics """
+    metrics = _request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_duration += time.perf_counter() - started
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # installed once per connection, rather than around every request, and idle outside of requests
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _request_metrics.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_duration += time.perf_counter() - started
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """ The Django template backend, adding the time spent rendering to the current request's metrics """
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+class RequestMetricsMiddleware:
+    """
+    Measures each request's total time, SQL queries and template rendering, reports them to the client
+    in a Server-Timing header when settings.METRICS_SERVER_TIMING is set, and adds them to the histograms
+    served by metrics_view, per URL name. Belongs first in MIDDLEWARE, so the time of every other
+    middleware is included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # lets Django call the instance as a coroutine function, as MiddlewareMixin does
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self.process_response(request, response, metrics)
+
+    async def __acall__(self, request):
+        # sync_to_async copies the context into worker threads, so queries run there are counted too
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self.process_response(request, response, metrics)
+
+    def view_name(self, request):
+        match = request.resolver_match
+        if match is None:
+            # answered by a middleware before URL resolution, such as the page cache
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return 'unresolved'
+        return match.view_name
+
+    def process_response(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        view = self.view_name(request)
+        REQUEST_DURATION.observe(total, view, request.method if request.method in METHODS else 'OTHER')
+        DB_QUERIES.observe(metrics.db_queries, view)
+        DB_DURATION.observe(metrics.db_duration, view)
+        TEMPLATE_DURATION.observe(metrics.template_duration, view)
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={metrics.db_duration * 1000:.1f};desc="{metrics.db_queries} queries", '
+                f'tpl;dur={metrics.template_duration * 1000:.1f}, total;dur={total * 1000:.1f}')
+        return response
+
+def metrics_view(request):
+    """
+    The histograms in Prometheus text format, only served to scrapers sending settings.METRICS_TOKEN as a
+    bearer token. The peer address is no proof of anything behind a reverse proxy.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not token or not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+        raise Http404
+    lines = [line for histogram in HISTOGRAMS for line in histogram.expose()]
+    return HttpResponse('\n'.join(lines) + '\n', content_type=CONTENT_TYPE)
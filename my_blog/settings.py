@@ -31,8 +31,10 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'my_blog.apps.MyBlogConfig',
     'blog.apps.BlogConfig',
     'user.apps.UserConfig',
+    'tasks.apps.TasksConfig',
     'crispy_forms',
     'django_cleanup',
     'django.contrib.admin',
@@ -44,7 +46,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'my_blog.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'my_blog.staticfiles.StaticFilesMiddleware',
+    'blog.middleware.PostViewCountMiddleware',
+    'blog.middleware.AnonymousPageCacheMiddleware',
+    'my_blog.db.DatabaseRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,7 +64,8 @@ ROOT_URLCONF = 'my_blog.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, also timing renders for my_blog.metrics
+        'BACKEND': 'my_blog.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -84,6 +92,32 @@ DATABASES = {
     }
 }
 
+# Read-only queries of safe requests go to a replica when BLOG_DB_REPLICA names a copy of the database
+# kept up to date from the primary, see my_blog/db.py. Tests treat it as a mirror of default.
+if os.environ.get('BLOG_DB_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BLOG_DB_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['my_blog.db.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after one of its requests wrote to it
+DATABASE_PRIMARY_STICKY_TIMEOUT = 10
+
+# Applied to every SQLite connection: readers do not block the writer in WAL mode, and a writer waits
+# up to busy_timeout milliseconds for the write lock instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+}
+
+
+# Keep the integer primary keys the existing migrations created
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -123,11 +157,69 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Where collectstatic gathers the static files for production
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Serve STATIC_ROOT from the application itself, with compressed variants and long lived caching, see
+# my_blog/staticfiles.py. Leave it off when a web server in front serves the static files.
+SERVE_STATIC = False
+
 MEDIA_ROOT=os.path.join(BASE_DIR, 'media')
 MEDIA_URL='/media/'
 
+# Serve MEDIA_ROOT outside DEBUG too, see my_blog/media.py. MEDIA_SENDFILE_HEADER hands the files over to
+# the web server instead: 'X-Sendfile' (Apache, lighttpd) with their path, or 'X-Accel-Redirect' (nginx)
+# with their name under MEDIA_ACCEL_REDIRECT_PREFIX, an internal location aliased to MEDIA_ROOT.
+SERVE_MEDIA = False
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
+# Keyset pagination for post lists: no COUNT(*) or OFFSET, only Prev/Next links
+BLOG_CURSOR_PAGINATION = False
+
+# Rendered article lists are cached per page under versioned keys, see blog/cache.py
+BLOG_FEED_CACHE_TIMEOUT = 60 * 60
+
+# Whole pages served to anonymous readers from the cache, see blog/middleware.py. Pages are dropped on
+# post and avatar changes, the timeouts only bound how long an unchanged page or a stale copy is kept.
+BLOG_PAGE_CACHE_VIEWS = ['blog-home', 'blog-user_posts', 'blog-post_detail']
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+BLOG_PAGE_CACHE_STALE_TIMEOUT = 60 * 60
+
+# Post views are counted in memory and written to PostViewCount at most every FLUSH_INTERVAL seconds per
+# process, or sooner once MAX_PENDING different posts have pending views, see blog/counters.py
+BLOG_VIEW_COUNT_FLUSH_INTERVAL = 10
+BLOG_VIEW_COUNT_MAX_PENDING = 1000
+
+# Dotted path to a blog.search.BaseSearchBackend, None picks SQLite FTS5 on SQLite
+BLOG_SEARCH_BACKEND = None
+
+# Background work such as avatar resizing, see tasks/backends.py. Use tasks.backends.DatabaseBackend
+# together with `manage.py worker` to run it in a separate process.
+TASKS = {
+    'BACKEND': 'tasks.backends.ThreadPoolBackend',
+    'OPTIONS': {
+        'max_workers': 2,
+    },
+}
+
+# Logged in users and their profiles are cached between requests, see user/backends.py. ModelBackend stays
+# listed so sessions logged in through it before still resolve; new logins go through the cached backend.
+AUTHENTICATION_BACKENDS = ['user.backends.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend']
+USER_CACHE_TIMEOUT = 60 * 60
+
+# Per request SQL, template and total times, see my_blog/metrics.py. They are always aggregated for
+# /metrics, which only answers requests with an `Authorization: Bearer <METRICS_TOKEN>` header and is off
+# without a token, and also sent to clients in a Server-Timing header if set.
+METRICS_SERVER_TIMING = True
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# /export/posts/ streams every post, so it is only served to staff and to requests with an
+# `Authorization: Bearer <EXPORT_TOKEN>` header
+EXPORT_TOKEN = os.environ.get('EXPORT_TOKEN')
+
 LOGIN_REDIRECT_URL = 'blog-home'
 LOGIN_URL = 'user-login'
 
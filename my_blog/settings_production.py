@@ -0,0 +1,43 @@
+"""
+Production settings for my_blog, selected with DJANGO_SETTINGS_MODULE=my_blog.settings_production.
+
+Everything not overridden here comes from my_blog/settings.py. The secret key and the served host
+names are read from the environment.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+import os
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+# Templates are read and parsed once per process instead of on every render. Changed templates are
+# only picked up by a restart.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# collectstatic writes content hashed names, which are cached for a year, and their gzip and brotli copies
+STATICFILES_STORAGE = 'my_blog.staticfiles.CompressedManifestStaticFilesStorage'
+SERVE_STATIC = True
+
+# Uploaded avatars are served by the application unless a web server in front takes them over
+SERVE_MEDIA = True
+
+# Query counts and SQL and template timings are not for every visitor; /metrics needs METRICS_TOKEN
+METRICS_SERVER_TIMING = False
@@ -0,0 +1,130 @@
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+import asyncio
+import gzip
+import mimetypes
+import os
+import re
+import urllib.parse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml')
+# (Content-Encoding, file suffix, compress), in order of preference
+ENCODINGS = ([('br', '.br', lambda content: brotli.compress(content, quality=11))] if brotli else []) + [
+    ('gzip', '.gz', lambda content: gzip.compress(content, compresslevel=9, mtime=0)),
+]
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CACHE_CONTROL = 'public, max-age=60'
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage also writing a gzip copy, and a brotli one when the brotli package is
+    installed, of every hashed text file collectstatic produces, for StaticFilesMiddleware to serve
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in paths:
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            if hashed_name and hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        for _, suffix, compress in ENCODINGS:
+            compressed = compress(content)
+            # a copy that barely saves anything costs more in decoding than it saves in transfer
+            if len(compressed) > len(content) * 0.95:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+def accepts_encoding(header, encoding):
+    """ Whether an Accept-Encoding header allows encoding """
+    for part in header.split(','):
+        token, _, params = part.partition(';')
+        if token.strip().lower() == encoding:
+            return not re.search(r'q=0(\.0*)?\s*$', params)
+    return False
+
+class StaticFilesMiddleware:
+    """
+    Serves the files collected into settings.STATIC_ROOT when settings.SERVE_STATIC is set, for
+    deployments without a web server in front to do it. Clients get the brotli or gzip copy written by
+    CompressedManifestStaticFilesStorage when they accept it, and hashed names, whose content never
+    changes, are cached by them for a year.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # lets Django call the instance as a coroutine function, as MiddlewareMixin does
+            markcoroutinefunction(self)
+        self.prefix = urllib.parse.urlsplit(settings.STATIC_URL).path
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        name = self.static_name(request)
+        response = self.serve(request, name) if name else None
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        name = self.static_name(request)
+        response = await sync_to_async(self.serve)(request, name) if name else None
+        return response if response is not None else await self.get_response(request)
+
+    def static_name(self, request):
+        """ Name of the static file requested, None for anything else """
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return None
+        return request.path_info[len(self.prefix):] or None
+
+    def serve(self, request, name):
+        """ Response with the file or its best compressed copy, None when there is no such file """
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        variants = [(encoding, path + suffix) for encoding, suffix, _ in ENCODINGS if os.path.isfile(path + suffix)]
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        encoding, served_path = next(((encoding, variant) for encoding, variant in variants
+            if accepts_encoding(accept_encoding, encoding)), (None, path))
+
+        stat = os.stat(served_path)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime, stat.st_size):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(path)
+            response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if name in self.immutable else CACHE_CONTROL
+        if variants:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
@@ -0,0 +1,110 @@
+from django.test import SimpleTestCase, RequestFactory, AsyncRequestFactory
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+
+from asgiref.sync import sync_to_async
+from unittest import mock
+import os
+import shutil
+import tempfile
+
+from blog.models import Post
+from my_blog.db import PRIMARY_COOKIE, DatabaseRoutingMiddleware, PrimaryReplicaRouter
+
+@mock.patch('my_blog.db.replica_enabled', return_value=True)
+class TestPrimaryReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def _call(self, request, write=False):
+        reads = []
+
+        def get_response(request):
+            reads.append(self.router.db_for_read(Post))
+            if write:
+                self.router.db_for_write(Post)
+                reads.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        return DatabaseRoutingMiddleware(get_response)(request), reads
+
+    def test_outside_request_uses_primary(self, replica_enabled):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_safe_request_reads_replica(self, replica_enabled):
+        response, reads = self._call(RequestFactory().get('/'))
+        self.assertEqual(reads, ['replica'])
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_unsafe_request_reads_primary(self, replica_enabled):
+        response, reads = self._call(RequestFactory().post('/'))
+        self.assertEqual(reads, ['default'])
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_write_pins_request_and_client(self, replica_enabled):
+        response, reads = self._call(RequestFactory().get('/'), write=True)
+        self.assertEqual(reads, ['replica', 'default'])
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]['max-age'], 10)
+        request = RequestFactory().get('/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+        self.assertEqual(self._call(request)[1], ['default'])
+
+    def test_without_replica(self, replica_enabled):
+        replica_enabled.return_value = False
+        self.assertEqual(self._call(RequestFactory().get('/'))[1], ['default'])
+
+    async def test_async_request(self, replica_enabled):
+        reads = []
+
+        def view():
+            reads.append(self.router.db_for_read(Post))
+            self.router.db_for_write(Post)
+
+        async def get_response(request):
+            await sync_to_async(view)()
+            reads.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = await DatabaseRoutingMiddleware(get_response)(AsyncRequestFactory().get('/'))
+        self.assertEqual(reads, ['replica', 'default'])
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+class TestSQLitePragmas(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.connections = ConnectionHandler({alias: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(self.directory, f'{alias}.sqlite3'),
+        } for alias in ['default', 'replica']})
+        self.addCleanup(self.connections.close_all)
+
+    def _pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_on_every_connection(self):
+        for alias in ['default', 'replica']:
+            connection = self.connections[alias]
+            self.assertEqual(self._pragma(connection, 'journal_mode'), 'wal')
+            self.assertEqual(self._pragma(connection, 'synchronous'), 1)
+            self.assertEqual(self._pragma(connection, 'busy_timeout'), 5000)
+
+    def test_readers_not_blocked_by_writer(self):
+        settings_dict = dict(self.connections.settings['default'])
+        reader = ConnectionHandler({'default': settings_dict})
+        self.addCleanup(reader.close_all)
+        writer = self.connections['default']
+        with writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE test_pragmas (id integer)')
+        writer.set_autocommit(False)
+        with writer.cursor() as cursor:
+            cursor.execute('INSERT INTO test_pragmas VALUES (1)')
+        with reader['default'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM test_pragmas')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        writer.rollback()
+        writer.set_autocommit(True)
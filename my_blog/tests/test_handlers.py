@@ -0,0 +1,56 @@
+from django.test import TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.urls import reverse
+
+from asgiref.sync import async_to_sync
+import json
+
+from blog.models import Post
+from my_blog.handlers import ASGIHandler
+
+class TestASGIHandler(TransactionTestCase):
+    def setUp(self):
+        # like the test client, keep the request from closing the test database connection
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        user = User.objects.create(username='testUser')
+        for i in range(5):
+            Post.objects.create(title=f'test Post {i}', content=f'test Post {i} content', author=user)
+
+    def _get(self, path, handler=None, headers=()):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), *headers], 'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(handler or ASGIHandler())(scope, receive, send)
+        return messages
+
+    @override_settings(EXPORT_TOKEN='export-token')
+    def test_streamed_export(self):
+        handler = ASGIHandler()
+        # several thread switches
+        handler.batch_size = 2
+        messages = self._get(reverse('blog-export_posts'), handler, [(b'authorization', b'Bearer export-token')])
+        self.assertEqual(messages[0]['type'], 'http.response.start')
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertEqual(messages[-1], {'type': 'http.response.body'})
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'test Post {i}' for i in range(5)])
+
+    def test_page(self):
+        messages = self._get(reverse('blog-about'))
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn(b'About', b''.join(message.get('body', b'') for message in messages[1:]))
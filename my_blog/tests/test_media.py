@@ -0,0 +1,156 @@
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.http import Http404
+from django.utils.http import http_date
+from PIL import Image
+
+import io
+import os
+import shutil
+import tempfile
+
+from my_blog.media import media_urlpatterns, parse_range, serve_media
+from user.avatars import generate_derivatives, derivative_name
+
+class TestParseRange(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=90-200', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-200', 100), (0, 99))
+
+    def test_ignored(self):
+        for header in ('bytes=0-9,20-29', 'bytes=-', 'bytes=9-0', 'items=0-9', 'bytes=a-b'):
+            self.assertIsNone(parse_range(header, 100), header)
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=100-', 'bytes=-0'):
+            with self.assertRaises(ValueError):
+                parse_range(header, 100)
+        with self.assertRaises(ValueError):
+            parse_range('bytes=-10', 0)
+
+class TestServeMedia(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls._media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls._media_settings.enable()
+        os.makedirs(os.path.join(cls.media_root, 'profile_pics'))
+        cls.avatar = os.path.join(cls.media_root, 'profile_pics', 'avatar.jpg')
+        Image.new('RGB', (300, 300), 'red').save(cls.avatar, 'JPEG')
+        with open(cls.avatar, 'rb') as file:
+            cls.content = file.read()
+        cls.derivative = derivative_name(generate_derivatives(cls.avatar), 65, 'jpg')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._media_settings.disable()
+        shutil.rmtree(cls.media_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, path='profile_pics/avatar.jpg', **headers):
+        response = serve_media(self.factory.get('/media/' + path, **headers), path)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Last-Modified'], http_date(os.stat(self.avatar).st_mtime))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertTrue(response['ETag'].startswith('"'))
+        # a real file, which servers can send with sendfile()
+        self.assertTrue(hasattr(response.file_to_stream, 'fileno'))
+
+    def test_derivative_is_immutable(self):
+        response = self.get(self.derivative)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        with Image.open(io.BytesIO(self.body(response))) as img:
+            self.assertEqual(img.size, (65, 65))
+
+    def test_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        response = self.get(HTTP_IF_MODIFIED_SINCE=http_date(os.stat(self.avatar).st_mtime))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[10:20])
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertFalse(hasattr(response.file_to_stream, 'fileno'))
+
+        response = self.get(HTTP_RANGE='bytes=-5')
+        self.assertEqual(self.body(response), self.content[-5:])
+        response = self.get(HTTP_RANGE='bytes=100-')
+        self.assertEqual(self.body(response), self.content[100:])
+
+    def test_unsatisfiable_range(self):
+        response = serve_media(self.factory.get('/', HTTP_RANGE=f'bytes={len(self.content)}-'),
+            'profile_pics/avatar.jpg')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_multiple_ranges_get_whole_file(self):
+        response = self.get(HTTP_RANGE='bytes=0-9,20-29')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"').status_code, 200)
+        last_modified = http_date(os.stat(self.avatar).st_mtime)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=last_modified).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=http_date(0)).status_code, 200)
+
+    def test_not_found(self):
+        for path in ('profile_pics/missing.jpg', '../settings.py', 'profile_pics'):
+            with self.assertRaises(Http404):
+                serve_media(self.factory.get('/'), path)
+
+    def test_safe_methods_only(self):
+        self.assertEqual(serve_media(self.factory.post('/'), 'profile_pics/avatar.jpg').status_code, 405)
+        response = serve_media(self.factory.head('/'), 'profile_pics/avatar.jpg')
+        self.addCleanup(response.close)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_x_accel_redirect(self):
+        response = self.get(self.derivative, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.derivative)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Sendfile')
+    def test_x_sendfile(self):
+        response = self.get()
+        self.assertEqual(response['X-Sendfile'], self.avatar)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_urlpatterns(self):
+        match = media_urlpatterns()[0].resolve('media/profile_pics/avatar.jpg')
+        self.assertEqual(match.func, serve_media)
+        self.assertEqual(match.kwargs, {'path': 'profile_pics/avatar.jpg'})
+        with override_settings(MEDIA_URL='https://media.example.com/'):
+            self.assertEqual(media_urlpatterns(), [])
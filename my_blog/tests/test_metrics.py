@@ -0,0 +1,95 @@
+from django.test import TestCase, AsyncRequestFactory, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from asgiref.sync import sync_to_async
+import re
+
+from blog.models import Post
+from my_blog.metrics import (DB_QUERIES, HISTOGRAMS, REQUEST_DURATION, TEMPLATE_DURATION, Histogram,
+    RequestMetricsMiddleware)
+
+class TestHistogram(TestCase):
+    def test_expose(self):
+        histogram = Histogram('test_seconds', 'Test histogram', ('view',), (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, 'blog-home')
+        histogram.observe(0.2, 'say "hi"')
+        self.assertEqual(list(histogram.expose()), [
+            '# HELP test_seconds Test histogram',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="blog-home",le="0.1"} 2',
+            'test_seconds_bucket{view="blog-home",le="1"} 3',
+            'test_seconds_bucket{view="blog-home",le="+Inf"} 4',
+            'test_seconds_sum{view="blog-home"} 3.65',
+            'test_seconds_count{view="blog-home"} 4',
+            'test_seconds_bucket{view="say \\"hi\\"",le="0.1"} 0',
+            'test_seconds_bucket{view="say \\"hi\\"",le="1"} 1',
+            'test_seconds_bucket{view="say \\"hi\\"",le="+Inf"} 1',
+            'test_seconds_sum{view="say \\"hi\\""} 0.2',
+            'test_seconds_count{view="say \\"hi\\""} 1',
+        ])
+
+@override_settings(BLOG_PAGE_CACHE_VIEWS=[])
+class TestRequestMetrics(TestCase):
+    def setUp(self):
+        cache.clear()
+        for histogram in HISTOGRAMS:
+            histogram.clear()
+        self.user = User.objects.create(username='testUser')
+        Post.objects.create(title='test Post', content='test Post content', author=self.user)
+
+    def _count(self, histogram, labels):
+        match = re.search(rf'^{histogram.name}_count{{{re.escape(labels)}}} (\d+)$',
+            '\n'.join(histogram.expose()), re.MULTILINE)
+        return int(match.group(1)) if match else 0
+
+    def test_server_timing(self):
+        response = self.client.get(reverse('blog-home'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+        self.assertNotIn('desc="0 queries"', timing)
+        self.assertGreater(float(re.search(r'tpl;dur=([\d.]+)', timing).group(1)), 0)
+
+        with override_settings(METRICS_SERVER_TIMING=False):
+            self.assertNotIn('Server-Timing', self.client.get(reverse('blog-home')))
+
+    def test_histograms_per_view(self):
+        self.client.get(reverse('blog-home'))
+        self.client.get(reverse('blog-home'))
+        self.client.get('/nopage/at/all/')
+        self.assertEqual(self._count(REQUEST_DURATION, 'view="blog-home",method="GET"'), 2)
+        self.assertEqual(self._count(DB_QUERIES, 'view="blog-home"'), 2)
+        self.assertEqual(self._count(TEMPLATE_DURATION, 'view="blog-home"'), 2)
+        self.assertEqual(self._count(REQUEST_DURATION, 'view="unresolved",method="GET"'), 1)
+
+    def test_queries_outside_requests_not_counted(self):
+        Post.objects.count()
+        render_to_string('blog/about.html')
+        self.assertEqual(list(DB_QUERIES.expose())[2:], [])
+
+    @override_settings(METRICS_TOKEN='test-token')
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('blog-home'))
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer test-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertContains(response, '# TYPE my_blog_request_duration_seconds histogram')
+        self.assertContains(response, 'my_blog_request_db_queries_count{view="blog-home"} 1')
+        # the peer address of a local reverse proxy is not enough
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1').status_code, 404)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer other').status_code, 404)
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code, 404)
+
+    async def test_async_counts_queries_in_threads(self):
+        async def get_response(request):
+            await sync_to_async(Post.objects.count)()
+            await sync_to_async(Post.objects.count)()
+            return HttpResponse()
+
+        response = await RequestMetricsMiddleware(get_response)(AsyncRequestFactory().get(reverse('blog-about')))
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
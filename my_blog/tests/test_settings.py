@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from unittest import mock
+import importlib
+import os
+import sys
+
+from my_blog.metrics import TimedDjangoTemplates
+
+class TestProductionSettings(SimpleTestCase):
+    def _load(self, **environ):
+        sys.modules.pop('my_blog.settings_production', None)
+        with mock.patch.dict(os.environ, environ):
+            try:
+                return importlib.import_module('my_blog.settings_production')
+            finally:
+                sys.modules.pop('my_blog.settings_production', None)
+
+    def test_settings(self):
+        settings = self._load(DJANGO_SECRET_KEY='secret', DJANGO_ALLOWED_HOSTS='blog.example.com,www.example.com')
+        self.assertFalse(settings.DEBUG)
+        self.assertEqual(settings.SECRET_KEY, 'secret')
+        self.assertEqual(settings.ALLOWED_HOSTS, ['blog.example.com', 'www.example.com'])
+        self.assertFalse(settings.METRICS_SERVER_TIMING)
+
+    def test_templates_parsed_once(self):
+        options = dict(self._load(DJANGO_SECRET_KEY='secret').TEMPLATES[0])
+        self.assertEqual(options.pop('BACKEND'), 'my_blog.metrics.TimedDjangoTemplates')
+        engine = TimedDjangoTemplates({**options, 'NAME': 'production'})
+        # TimedTemplate wraps the backend's Template, which wraps the parsed django.template.Template
+        self.assertIs(engine.get_template('blog/about.html').template.template,
+            engine.get_template('blog/about.html').template.template)
+
+    def test_secret_key_required(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DJANGO_SECRET_KEY', None)
+            with self.assertRaises(KeyError):
+                self._load()
@@ -0,0 +1,111 @@
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.utils.http import http_date
+
+from asgiref.sync import async_to_sync
+import gzip
+import os
+import shutil
+import tempfile
+
+from my_blog.staticfiles import StaticFilesMiddleware, accepts_encoding
+
+CSS = 'body { margin: 0; }\n' * 100
+
+class StaticFilesTestCase(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.source, 'blog'))
+        with open(os.path.join(self.source, 'blog', 'site.css'), 'w') as file:
+            file.write(CSS)
+        with open(os.path.join(self.source, 'blog', 'logo.png'), 'wb') as file:
+            file.write(b'\x89PNG' + bytes(range(256)))
+        settings = override_settings(STATIC_ROOT=self.root, STATICFILES_DIRS=[self.source], SERVE_STATIC=True,
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE='my_blog.staticfiles.CompressedManifestStaticFilesStorage')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+class TestCompressedManifestStaticFilesStorage(StaticFilesTestCase):
+    def test_writes_compressed_copies_of_hashed_text_files(self):
+        css = staticfiles_storage.stored_name('blog/site.css')
+        self.assertNotEqual(css, 'blog/site.css')
+        with open(os.path.join(self.root, css + '.gz'), 'rb') as file:
+            self.assertEqual(gzip.decompress(file.read()).decode(), CSS)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'blog', 'site.css.gz')))
+        png = staticfiles_storage.stored_name('blog/logo.png')
+        self.assertFalse(os.path.exists(os.path.join(self.root, png + '.gz')))
+
+    def test_collects_again(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        css = staticfiles_storage.stored_name('blog/site.css')
+        self.assertTrue(os.path.exists(os.path.join(self.root, css + '.gz')))
+        self.assertFalse([name for name in os.listdir(os.path.join(self.root, 'blog')) if '_' in name])
+
+class TestStaticFilesMiddleware(StaticFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse('view'))
+        self.css = '/static/' + staticfiles_storage.stored_name('blog/site.css')
+
+    def test_not_used_by_default(self):
+        with override_settings(SERVE_STATIC=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                StaticFilesMiddleware(lambda request: HttpResponse())
+
+    def test_accepts_encoding(self):
+        self.assertTrue(accepts_encoding('gzip, deflate, br', 'br'))
+        self.assertTrue(accepts_encoding('br;q=0.5, GZIP', 'gzip'))
+        self.assertFalse(accepts_encoding('gzip;q=0, br', 'gzip'))
+        self.assertFalse(accepts_encoding('deflate', 'gzip'))
+
+    def test_gzip(self):
+        response = self.middleware(self.factory.get(self.css, HTTP_ACCEPT_ENCODING='gzip, deflate'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).decode(), CSS)
+        response.close()
+
+    def test_identity(self):
+        response = self.middleware(self.factory.get(self.css))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(b''.join(response.streaming_content).decode(), CSS)
+        response.close()
+
+    def test_unhashed_name_is_not_immutable(self):
+        response = self.middleware(self.factory.get('/static/blog/logo.png'))
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertFalse(response.has_header('Vary'))
+        response.close()
+
+    def test_not_modified(self):
+        mtime = os.stat(os.path.join(self.root, self.css[len('/static/'):])).st_mtime
+        response = self.middleware(self.factory.get(self.css, HTTP_IF_MODIFIED_SINCE=http_date(mtime)))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_passes_other_requests_on(self):
+        for request in (self.factory.get('/static/blog/missing.css'), self.factory.get('/static/../settings.py'),
+                self.factory.post(self.css), self.factory.get('/about/')):
+            self.assertEqual(self.middleware(request).content, b'view')
+
+    def test_async(self):
+        async def get_response(request):
+            return HttpResponse('view')
+        middleware = StaticFilesMiddleware(get_response)
+        response = async_to_sync(middleware)(self.factory.get(self.css, HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response.close()
+        self.assertEqual(async_to_sync(middleware)(self.factory.get('/about/')).content, b'view')
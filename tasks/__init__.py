@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        config = settings.TASKS
+        _backend = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _backend
+
+def enqueue(path, *args):
+    """
+    Run the function at the given dotted path with JSON serializable args on the configured
+    backend (settings.TASKS), outside of the current request.
+    """
+    get_backend().enqueue(path, list(args))
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'TASKS':
+        _backend = None
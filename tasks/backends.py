@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import json
+import logging
+import multiprocessing
+
+import django
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+def run_task(path, args, close_connections=False):
+    try:
+        return import_string(path)(*args)
+    except Exception:
+        logger.exception('Task %s%r failed', path, tuple(args))
+        raise
+    finally:
+        # pool threads and processes outlive requests, so nothing else would close their connections
+        if close_connections:
+            connections.close_all()
+
+def _setup_worker_process():
+    django.setup()
+
+class BaseBackend:
+    def enqueue(self, path, args):
+        raise NotImplementedError('subclasses of BaseBackend must provide an enqueue() method')
+
+class PoolBackend(BaseBackend):
+    """
+    Runs tasks in an in-process executor once the current transaction commits. With synchronous=True
+    tasks run immediately in the calling thread, which is what tests want.
+    """
+    def __init__(self, max_workers=2, synchronous=False):
+        self.max_workers = max_workers
+        self.synchronous = synchronous
+        self._executor = None
+
+    def get_executor(self):
+        raise NotImplementedError('subclasses of PoolBackend must provide a get_executor() method')
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = self.get_executor()
+        return self._executor
+
+    def enqueue(self, path, args):
+        if self.synchronous:
+            run_task(path, args)
+        else:
+            transaction.on_commit(lambda: self.executor.submit(run_task, path, args, close_connections=True))
+
+class ThreadPoolBackend(PoolBackend):
+    def get_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tasks')
+
+class ProcessPoolBackend(PoolBackend):
+    def get_executor(self):
+        # spawn rather than fork, so children never share the parent's database connections
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_setup_worker_process)
+
+class DatabaseBackend(BaseBackend):
+    """ Stores tasks in the Task table, to be run by `manage.py worker` """
+    def enqueue(self, path, args):
+        from .models import Task
+        Task.objects.create(path=path, args=json.dumps(args))
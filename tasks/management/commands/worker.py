@@ -0,0 +1,71 @@
+from datetime import timedelta
+import time
+import traceback
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tasks.backends import run_task
+from tasks.models import Task
+
+class Command(BaseCommand):
+    help = 'Runs tasks queued by tasks.backends.DatabaseBackend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-attempts', type=int, default=3, help='Attempts before a task is marked failed')
+        parser.add_argument('--claim-timeout', type=float, default=600,
+            help='Seconds after which a task still running is taken to belong to a crashed worker and is queued again')
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            close_old_connections()
+            self.requeue_stale_tasks(options['claim_timeout'], options['max_attempts'])
+            task = self.claim_task()
+            if task is None:
+                if options['burst']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            self.run(task, options['max_attempts'])
+            processed += 1
+        self.stdout.write(f'Processed {processed} task(s)')
+
+    def requeue_stale_tasks(self, claim_timeout, max_attempts):
+        """
+        Queues tasks again whose worker died while running them, or fails them once they used up their attempts,
+        as a task may well be what kills the worker. Tasks claimed before claimed_at existed have none.
+        """
+        now = timezone.now()
+        stale = Task.objects.filter(Q(claimed_at__lt=now - timedelta(seconds=claim_timeout)) |
+            Q(claimed_at__isnull=True), status=Task.RUNNING)
+        error = f'Worker did not finish the task within {claim_timeout:g} seconds'
+        stale.filter(attempts__gte=max_attempts).update(status=Task.FAILED, error=error)
+        stale.filter(attempts__lt=max_attempts).update(status=Task.QUEUED, error=error, run_after=now)
+
+    def claim_task(self):
+        queued = Task.objects.filter(status=Task.QUEUED, run_after__lte=timezone.now()).order_by('run_after', 'id')
+        for task in queued[:10]:
+            # the conditional UPDATE lets only one of several concurrent workers claim a task
+            if Task.objects.filter(pk=task.pk, status=Task.QUEUED).update(status=Task.RUNNING,
+                    attempts=F('attempts') + 1, claimed_at=timezone.now()):
+                task.status = Task.RUNNING
+                task.attempts += 1
+                return task
+        return None
+
+    def run(self, task, max_attempts):
+        try:
+            run_task(task.path, task.get_args())
+        except Exception:
+            if task.attempts >= max_attempts:
+                Task.objects.filter(pk=task.pk).update(status=Task.FAILED, error=traceback.format_exc())
+            else:
+                Task.objects.filter(pk=task.pk).update(status=Task.QUEUED, error=traceback.format_exc(),
+                    run_after=timezone.now() + timedelta(seconds=2 ** task.attempts))
+        else:
+            task.delete()
@@ -0,0 +1,35 @@
+import json
+
+from django.db import models
+from django.utils import timezone
+
+class Task(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    path = models.CharField(max_length=200)
+    args = models.TextField(default='[]')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(default=timezone.now)
+    run_after = models.DateTimeField(default=timezone.now)
+    # when a worker set the task RUNNING, see `manage.py worker --claim-timeout`
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='tasks_task_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.path}({self.args}) [{self.status}]'
+
+    def get_args(self):
+        return json.loads(self.args)
@@ -0,0 +1,107 @@
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from tasks import enqueue, get_backend
+from tasks.backends import ThreadPoolBackend
+from tasks.management.commands import worker
+from tasks.models import Task
+
+from datetime import timedelta
+import io
+
+calls = []
+
+def record(*args):
+    calls.append(args)
+
+def fail(*args):
+    raise ValueError('task failed')
+
+class TestBackends(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    @override_settings(TASKS={'BACKEND': 'tasks.backends.ThreadPoolBackend', 'OPTIONS': {'synchronous': True}})
+    def test_synchronous_pool(self):
+        enqueue('tasks.tests.test_tasks.record', 1, 'a')
+        self.assertEqual(calls, [(1, 'a')])
+
+    @override_settings(TASKS={'BACKEND': 'tasks.backends.ThreadPoolBackend', 'OPTIONS': {'max_workers': 1}})
+    def test_thread_pool(self):
+        backend = get_backend()
+        self.assertIsInstance(backend, ThreadPoolBackend)
+        backend.executor.submit(record, 2).result(timeout=5)
+        self.assertEqual(calls, [(2,)])
+
+    @override_settings(TASKS={'BACKEND': 'tasks.backends.DatabaseBackend'})
+    def test_database_queue(self):
+        enqueue('tasks.tests.test_tasks.record', 3, 'b')
+        self.assertEqual(calls, [])
+        task = Task.objects.get()
+        self.assertEqual(task.path, 'tasks.tests.test_tasks.record')
+        self.assertEqual(task.get_args(), [3, 'b'])
+
+class TestWorker(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_and_removes_tasks(self):
+        Task.objects.create(path='tasks.tests.test_tasks.record', args='[1]')
+        Task.objects.create(path='tasks.tests.test_tasks.record', args='[2]')
+        out = io.StringIO()
+        call_command('worker', burst=True, stdout=out)
+        self.assertEqual(calls, [(1,), (2,)])
+        self.assertFalse(Task.objects.exists())
+        self.assertIn('Processed 2 task(s)', out.getvalue())
+
+    def test_worker_retries_then_fails(self):
+        task = Task.objects.create(path='tasks.tests.test_tasks.fail')
+        with self.assertLogs('tasks.backends', 'ERROR'):
+            call_command('worker', burst=True, max_attempts=2, stdout=io.StringIO())
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertEqual(task.attempts, 1)
+        self.assertIn('ValueError', task.error)
+
+        Task.objects.filter(pk=task.pk).update(run_after=task.created)
+        with self.assertLogs('tasks.backends', 'ERROR'):
+            call_command('worker', burst=True, max_attempts=2, stdout=io.StringIO())
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_worker_skips_claimed_tasks(self):
+        Task.objects.create(path='tasks.tests.test_tasks.record', args='[1]', status=Task.RUNNING,
+            claimed_at=timezone.now())
+        call_command('worker', burst=True, stdout=io.StringIO())
+        self.assertEqual(calls, [])
+
+    def test_worker_requeues_tasks_of_crashed_workers(self):
+        claimed_at = timezone.now() - timedelta(minutes=5)
+        crashed = Task.objects.create(path='tasks.tests.test_tasks.record', args='[1]', status=Task.RUNNING,
+            attempts=1, claimed_at=claimed_at)
+        exhausted = Task.objects.create(path='tasks.tests.test_tasks.record', args='[2]', status=Task.RUNNING,
+            attempts=2, claimed_at=claimed_at)
+        call_command('worker', burst=True, max_attempts=2, claim_timeout=60, stdout=io.StringIO())
+        self.assertEqual(calls, [(1,)])
+        self.assertFalse(Task.objects.filter(pk=crashed.pk).exists())
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, Task.FAILED)
+        self.assertIn('did not finish', exhausted.error)
+
+    def test_worker_leaves_recent_claims(self):
+        task = Task.objects.create(path='tasks.tests.test_tasks.record', args='[1]', status=Task.RUNNING,
+            attempts=1, claimed_at=timezone.now() - timedelta(seconds=30))
+        call_command('worker', burst=True, claim_timeout=60, stdout=io.StringIO())
+        self.assertEqual(calls, [])
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.RUNNING)
+
+    def test_worker_records_claim_time(self):
+        task = Task.objects.create(path='tasks.tests.test_tasks.record', args='[1]')
+        command = worker.Command()
+        self.assertEqual(command.claim_task().pk, task.pk)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.RUNNING)
+        self.assertLess(timezone.now() - task.claimed_at, timedelta(seconds=5))
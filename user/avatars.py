@@ -0,0 +1,64 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+import hashlib
+import io
+
+# display widths in CSS pixels, matching .article-img and .account-img in blog/main.css
+AVATAR_SIZES = {
+    'small': 65,
+    'large': 125,
+}
+DENSITIES = (1, 2)
+WEBP = features.check('webp')
+FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'} if WEBP else {'jpg': 'JPEG'}
+DERIVED_DIR = 'profile_pics/derived'
+
+def derivative_name(img_hash, width, ext):
+    return f'{DERIVED_DIR}/{img_hash}-{width}.{ext}'
+
+def derivative_widths():
+    return sorted({size * density for size in AVATAR_SIZES.values() for density in DENSITIES})
+
+def derivative_names(img_hash):
+    return [derivative_name(img_hash, width, ext) for width in derivative_widths() for ext in FORMATS]
+
+def generate_derivatives(path):
+    """
+    Write square WebP and JPEG copies of the image at every display size and density. Names carry a
+    hash of the source content, so files never change once written and may be cached forever.
+    Returns the hash.
+    """
+    with open(path, 'rb') as file:
+        img_hash = hashlib.sha256(file.read()).hexdigest()[:16]
+
+    with Image.open(path) as img:
+        img = img.convert('RGB')
+        for width in derivative_widths():
+            resized = ImageOps.fit(img, (width, width), Image.LANCZOS)
+            for ext, image_format in FORMATS.items():
+                name = derivative_name(img_hash, width, ext)
+                if default_storage.exists(name):
+                    continue
+                buffer = io.BytesIO()
+                resized.save(buffer, image_format, quality=85)
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+    return img_hash
+
+def delete_derivatives(img_hash):
+    for name in derivative_names(img_hash):
+        default_storage.delete(name)
+
+def avatar_sources(profile, size):
+    """ (webp srcset, jpeg srcset, jpeg src) for the given display size, or None if not generated yet """
+    if not profile.img_hash:
+        return None
+    width = AVATAR_SIZES[size]
+
+    def srcset(ext):
+        return ', '.join(f'{default_storage.url(derivative_name(profile.img_hash, width * density, ext))} {density}x'
+            for density in DENSITIES)
+
+    jpg_src = default_storage.url(derivative_name(profile.img_hash, width, 'jpg'))
+    return srcset('webp') if WEBP else None, srcset('jpg'), jpg_src
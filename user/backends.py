@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+USER_CACHE_KEY = 'user:auth:{}'
+
+def invalidate_cached_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user(), run by AuthenticationMiddleware on every request, is served from the
+    cache. The profile is stored along with the user, so templates and views reading request.user.profile
+    need no query either. user/signals.py drops the entry whenever the user or the profile is saved or
+    deleted, which covers logins and password changes.
+    """
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            # stops authenticate() here: ModelBackend, listed after this backend for older sessions, would only
+            # hash the same password once more
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = get_user_model()._default_manager.select_related('profile').get(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -1,17 +1,34 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from django.urls import NoReverseMatch, Resolver404, resolve, reverse
 
 from .models import Profile
 
-class UserRegisterForm(UserCreationForm):
+# the pages of every user, which no other URL may take
+USER_URL_NAMES = ('blog-user_posts', 'blog-user_feed_rss', 'blog-user_feed_atom')
+
+class RoutableUsernameMixin:
+    """ Rejects usernames whose pages another URL would answer instead, such as 'search' or 'admin' """
+    def clean_username(self):
+        username = self.cleaned_data['username']
+        for name in USER_URL_NAMES:
+            try:
+                routable = resolve(reverse(name, args=[username])).url_name == name
+            except (NoReverseMatch, Resolver404):
+                routable = False
+            if not routable:
+                raise forms.ValidationError('This username is reserved. Please choose another one.', code='reserved')
+        return username
+
+class UserRegisterForm(RoutableUsernameMixin, UserCreationForm):
     email = forms.EmailField()
 
     class Meta:
         model = User
         fields = ['username', 'email', 'password1', 'password2']
 
-class UserUpdateForm(forms.ModelForm):
+class UserUpdateForm(RoutableUsernameMixin, forms.ModelForm):
     email = forms.EmailField()
 
     class Meta:
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='img_hash',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
@@ -1,16 +1,78 @@
 from django.db import models
+from django.db.models import DEFERRED
 from django.contrib.auth.models import User
 from PIL import Image
 
+import tempfile
+import shutil
+import os
+
+from tasks import enqueue
+
+DEFAULT_IMG = 'default.jpg'
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    img = models.ImageField(default='default.jpg', upload_to='profile_pics')
+    img = models.ImageField(default=DEFAULT_IMG, upload_to='profile_pics')
+    # content hash naming the resized derivatives in user/avatars.py, empty until they are generated
+    img_hash = models.CharField(max_length=16, blank=True, editable=False)
+    # maintained by blog/stats.py with relative UPDATEs as posts are created, moved and deleted
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-post_count'], name='user_profile_post_count_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username}\'s profile'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {name: value for name, value in zip(field_names, values) if value is not DEFERRED}
+        return instance
+
+    def get_changed_fields(self):
+        """
+        Names of fields whose value differs from the one last loaded from or saved to the database.
+        Inside post_save receivers this still describes the changes being saved.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            if loaded is None or self._state.adding:
+                changed.add(field.name)
+            elif field.attname in loaded and (field.get_prep_value(getattr(self, field.attname)) !=
+                    field.get_prep_value(loaded[field.attname])):
+                changed.add(field.name)
+        return changed
+
     def save(self, *args, **kwargs):
+        changed_fields = self.get_changed_fields()
+        old_img_hash = self.img_hash
+        if 'img' in changed_fields:
+            self.img_hash = ''
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # never write back a post_count loaded before posts were added or removed
+            kwargs['update_fields'] = [f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'post_count']
         super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        saved = [f for f in self._meta.concrete_fields if update_fields is None or f.name in update_fields]
+        self._loaded_values = {**getattr(self, '_loaded_values', {}),
+            **{f.attname: f.get_prep_value(getattr(self, f.attname)) for f in saved}}
+
+        if 'img' in changed_fields and self.img.name != DEFAULT_IMG:
+            enqueue('user.tasks.process_profile_img', self.pk, self.img.name)
+        if 'img' in changed_fields and old_img_hash:
+            enqueue('user.tasks.delete_unused_derivatives', old_img_hash)
+
+    def resize_img(self):
+        """ Thumbnail the image in place; the original keeps being served until the resized file replaces it """
         img = Image.open(self.img.path)
 
         if img.width > 250:
@@ -21,4 +83,8 @@ class Profile(models.Model):
         else:
             if img.height > 250:
                 img.thumbnail((img.height, 250))
-        img.save(self.img.path)
+
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(self.img.path), delete=False) as file:
+            img.save(file, img.format)
+        shutil.copymode(self.img.path, file.name)
+        os.replace(file.name, self.img.path)
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.models import User
 from django.dispatch import receiver
 
+from .backends import invalidate_cached_user
 from .models import Profile
 
 @receiver(post_save, sender=User)
@@ -10,5 +12,24 @@ def create_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def save_profile(sender, instance, created, **kwargs):
+    # a profile that was never loaded alongside this user cannot carry unsaved changes, e.g. on login
+    if created or not User.profile.related.is_cached(instance):
+        return
+    if instance.profile.get_changed_fields():
+        instance.profile.save()
+
+def _invalidate_cached_user(user_id):
+    invalidate_cached_user(user_id)
+    # and again once committed, in case a concurrent request cached the old row in the meantime
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    _invalidate_cached_user(instance.pk)
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_user_profile(sender, instance, **kwargs):
+    _invalidate_cached_user(instance.user_id)
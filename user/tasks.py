@@ -0,0 +1,16 @@
+from .avatars import generate_derivatives, delete_derivatives
+from .models import Profile
+
+def process_profile_img(profile_id, img_name):
+    profile = Profile.objects.filter(pk=profile_id, img=img_name).first()
+    # the image was replaced or the profile deleted before this task ran
+    if profile is None:
+        return
+    profile.resize_img()
+    profile.img_hash = generate_derivatives(profile.img.path)
+    profile.save(update_fields=['img_hash'])
+
+def delete_unused_derivatives(img_hash):
+    # derivatives are content addressed, another profile may use the same picture
+    if not Profile.objects.filter(img_hash=img_hash).exists():
+        delete_derivatives(img_hash)
@@ -0,0 +1,17 @@
+from django import template
+from django.utils.html import format_html
+
+from user.avatars import avatar_sources
+
+register = template.Library()
+
+@register.simple_tag
+def avatar(profile, size='small', css_class=''):
+    """ Responsive <picture> for the profile's avatar, or the plain image until derivatives exist """
+    sources = avatar_sources(profile, size)
+    if sources is None:
+        return format_html('<img class="{}" src="{}" alt="">', css_class, profile.img.url)
+    webp_srcset, jpg_srcset, jpg_src = sources
+    webp = format_html('<source type="image/webp" srcset="{}">', webp_srcset) if webp_srcset else ''
+    return format_html('<picture>{}<img class="{}" src="{}" srcset="{}" alt=""></picture>', webp, css_class,
+        jpg_src, jpg_srcset)
@@ -0,0 +1,85 @@
+from django.test import TestCase, override_settings
+from django.template import Context, Template
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+import tempfile
+import shutil
+import io
+
+from user.avatars import derivative_name, derivative_names, WEBP
+from user.models import Profile
+
+@override_settings(TASKS={'BACKEND': 'tasks.backends.ThreadPoolBackend', 'OPTIONS': {'synchronous': True}})
+class TestAvatars(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls._media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls._media_settings.enable()
+        Image.new('RGB', (200, 200), 'black').save(cls.media_root + '/default.jpg', 'JPEG')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._media_settings.disable()
+        shutil.rmtree(cls.media_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create(username='testUser')
+
+    def _upload(self, color='white'):
+        file = io.BytesIO()
+        Image.new('RGB', (400, 300), color).save(file, 'JPEG')
+        profile = Profile.objects.get(user=self.user)
+        profile.img = SimpleUploadedFile('test.jpg', file.getvalue(), content_type='image/jpg')
+        profile.save()
+        return Profile.objects.get(user=self.user)
+
+    def _render(self, profile, size):
+        return Template("{% load avatar_tags %}{% avatar profile size 'rounded-circle' %}").render(
+            Context({'profile': profile, 'size': size}))
+
+    def test_upload_generates_derivatives(self):
+        profile = self._upload()
+        self.assertEqual(len(profile.img_hash), 16)
+        for name in derivative_names(profile.img_hash):
+            self.assertTrue(default_storage.exists(name), name)
+        with Image.open(default_storage.path(derivative_name(profile.img_hash, 130, 'jpg'))) as img:
+            self.assertEqual(img.size, (130, 130))
+            self.assertEqual(img.format, 'JPEG')
+        if WEBP:
+            with Image.open(default_storage.path(derivative_name(profile.img_hash, 250, 'webp'))) as img:
+                self.assertEqual(img.format, 'WEBP')
+
+    def test_same_content_same_names(self):
+        """ derivative names depend only on image content """
+        first_hash = self._upload().img_hash
+        other = User.objects.create(username='otherUser')
+        self.user = other
+        self.assertEqual(self._upload().img_hash, first_hash)
+
+    def test_replacing_img_removes_unused_derivatives(self):
+        old_hash = self._upload('white').img_hash
+        new_hash = self._upload('red').img_hash
+        self.assertNotEqual(old_hash, new_hash)
+        self.assertFalse(default_storage.exists(derivative_name(old_hash, 65, 'jpg')))
+        self.assertTrue(default_storage.exists(derivative_name(new_hash, 65, 'jpg')))
+
+    def test_avatar_tag_srcset(self):
+        profile = self._upload()
+        html = self._render(profile, 'small')
+        self.assertIn(f'src="/media/profile_pics/derived/{profile.img_hash}-65.jpg"', html)
+        self.assertIn(f'/media/profile_pics/derived/{profile.img_hash}-130.jpg 2x', html)
+        if WEBP:
+            self.assertIn(f'<source type="image/webp" srcset="/media/profile_pics/derived/{profile.img_hash}-65.webp',
+                html)
+        self.assertIn(f'{profile.img_hash}-250.jpg 2x', self._render(profile, 'large'))
+
+    def test_avatar_tag_without_derivatives(self):
+        """ default avatar and avatars still being processed render the original image """
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(self._render(profile, 'small'), '<img class="rounded-circle" src="/media/default.jpg" alt="">')
@@ -0,0 +1,80 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth import BACKEND_SESSION_KEY, authenticate, get_user
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from unittest import mock
+
+from blog.sidebar import sidebar_data
+from user.backends import CachedModelBackend
+
+class TestCachedModelBackend(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testUser', email='test@test.com', password='testPassword1')
+        self.client.force_login(self.user)
+        self.url = reverse('user-profile')
+
+    def _auth_queries(self, url):
+        sidebar_data()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries
+            if 'FROM "auth_user"' in q['sql'] or 'FROM "user_profile"' in q['sql']]
+
+    def test_cached_user_and_profile(self):
+        """ once cached, pages reading request.user and request.user.profile run no auth queries """
+        self.assertEqual(len(self._auth_queries(self.url)), 1)
+        self.assertEqual(self._auth_queries(self.url), [])
+        self.assertEqual(self._auth_queries(reverse('blog-home')), [])
+
+    def test_user_save_invalidates(self):
+        self.client.get(self.url)
+        self.user.email = 'changed@test.com'
+        self.user.save()
+        self.assertContains(self.client.get(self.url), 'changed@test.com')
+
+    def test_profile_save_invalidates(self):
+        self.client.get(self.url)
+        self.user.profile.img_hash = 'abcdef0123456789'
+        self.user.profile.save()
+        self.assertContains(self.client.get(self.url), 'abcdef0123456789-125.jpg')
+
+    def test_password_change_logs_out(self):
+        self.client.get(self.url)
+        self.user.set_password('otherPassword1')
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, '/user/login/?next=' + self.url)
+
+    def test_inactive_and_deleted_users(self):
+        backend = CachedModelBackend()
+        self.assertEqual(backend.get_user(self.user.pk), self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.user.refresh_from_db()
+        self.user.save()
+        self.assertIsNone(backend.get_user(self.user.pk))
+        self.user.delete()
+        self.assertIsNone(backend.get_user(self.user.pk))
+
+    def test_session_user(self):
+        self.client.get(self.url)
+        request = self.client.get(self.url).wsgi_request
+        self.assertEqual(get_user(request), self.user)
+
+    def test_model_backend_sessions_resolve(self):
+        """ sessions logged in before CachedModelBackend existed stay logged in """
+        session = self.client.session
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session.save()
+        self.assertEqual(self.client.get(self.url).wsgi_request.user, self.user)
+
+    def test_failed_login_checks_password_once(self):
+        with mock.patch('django.contrib.auth.base_user.AbstractBaseUser.check_password', return_value=False) as check:
+            self.assertIsNone(authenticate(username='testUser', password='wrongPassword'))
+        self.assertEqual(check.call_count, 1)
+        self.assertEqual(authenticate(username='testUser', password='testPassword1'), self.user)
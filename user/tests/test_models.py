@@ -0,0 +1,112 @@
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from unittest import mock
+import tempfile
+import shutil
+import io
+
+from user.models import Profile
+
+SYNCHRONOUS_TASKS = {'BACKEND': 'tasks.backends.ThreadPoolBackend', 'OPTIONS': {'synchronous': True}}
+
+@override_settings(TASKS=SYNCHRONOUS_TASKS)
+class TestProfile(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls._media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls._media_settings.enable()
+        Image.new('RGB', (200, 200), 'black').save(cls.media_root + '/default.jpg', 'JPEG')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._media_settings.disable()
+        shutil.rmtree(cls.media_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testUser', email='testUser@email.com',
+            password='somepassword')
+
+    def _create_img_file(self, size=(400, 300)):
+        file = io.BytesIO()
+        Image.new('RGB', size, 'white').save(file, 'JPEG')
+        return SimpleUploadedFile('test.jpg', file.getvalue(), content_type='image/jpg')
+
+    def test_login_does_not_process_img(self):
+        """ logging in updates last_login without touching the profile or its image """
+        with mock.patch('user.models.Image.open') as image_open, CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('user-login'), {'username': 'testUser', 'password': 'somepassword'})
+        self.assertEqual(response.status_code, 302)
+        image_open.assert_not_called()
+        self.assertFalse([q for q in ctx.captured_queries if 'user_profile' in q['sql']])
+
+    def test_user_update_does_not_process_img(self):
+        """ saving username or email changes does not save the profile """
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.username = 'newName'
+        user.email = 'newName@email.com'
+        with mock.patch('user.models.Image.open') as image_open, CaptureQueriesContext(connection) as ctx:
+            user.save()
+        image_open.assert_not_called()
+        self.assertFalse([q for q in ctx.captured_queries if 'user_profile' in q['sql']])
+
+    def test_profile_view_user_update_does_not_process_img(self):
+        """ profile view only changing username and email does no image I/O """
+        self.client.force_login(self.user)
+        with mock.patch('user.models.Image.open') as image_open:
+            response = self.client.post(reverse('user-profile'), {'username': 'newName',
+                'email': 'newName@email.com'})
+        self.assertEqual(response.status_code, 302)
+        image_open.assert_not_called()
+
+    def test_profile_view_img_update_processes_img_once(self):
+        self.client.force_login(self.user)
+        with mock.patch.object(Profile, 'resize_img', autospec=True) as resize_img:
+            response = self.client.post(reverse('user-profile'), {'img': self._create_img_file(),
+                'username': 'testUser', 'email': 'testUser@email.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(resize_img.call_count, 1)
+
+    def test_img_change_resizes(self):
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.get_changed_fields(), set())
+        profile.img = self._create_img_file()
+        self.assertEqual(profile.get_changed_fields(), {'img'})
+        profile.save()
+        self.assertEqual(profile.get_changed_fields(), set())
+        with Image.open(profile.img.path) as img:
+            self.assertEqual(img.size, (250, 188))
+
+    def test_img_change_queued_until_commit(self):
+        """ with a thread pool the resize waits for the transaction, the original file is served meanwhile """
+        with override_settings(TASKS={'BACKEND': 'tasks.backends.ThreadPoolBackend'}), \
+                mock.patch('tasks.backends.transaction.on_commit') as on_commit:
+            profile = Profile.objects.get(user=self.user)
+            profile.img = self._create_img_file()
+            profile.save()
+        # cached user invalidation registers its own on_commit callbacks
+        queued = [args[0] for args, kwargs in on_commit.call_args_list if 'PoolBackend' in args[0].__qualname__]
+        self.assertEqual(len(queued), 1)
+        with Image.open(profile.img.path) as img:
+            self.assertEqual(img.size, (400, 300))
+
+    def test_resize_task_skips_replaced_img(self):
+        from user.tasks import process_profile_img
+        profile = Profile.objects.get(user=self.user)
+        with mock.patch.object(Profile, 'resize_img') as resize_img:
+            process_profile_img(profile.pk, 'profile_pics/old.jpg')
+        resize_img.assert_not_called()
+
+    def test_unchanged_save_does_not_process_img(self):
+        profile = Profile.objects.get(user=self.user)
+        with mock.patch('user.models.Image.open') as image_open:
+            profile.save()
+        image_open.assert_not_called()
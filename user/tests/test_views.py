@@ -72,6 +72,22 @@ class TestViews(TestCase):
         self.assertEqual(user.email, 'testUser@email.com')
         self.assertEqual(user.password, 'somepassword')
 
+    def test_register_POST_reserved_username(self):
+        """ register view rejects usernames whose pages other URLs would answer """
+        for username in ['search', 'admin', 'about', 'most-read']:
+            response = self.client.post(self.register_url, {'username': username, 'email': 'newUser@email.com',
+                'password1': 'somepassword2', 'password2': 'somepassword2'})
+            self.assertEqual(response.status_code, 200, username)
+            self.assertContains(response, 'This username is reserved')
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_profile_POST_reserved_username(self):
+        """ profile view does not rename user to a reserved username """
+        self.client.force_login(self.testUser)
+        response = self.client.post(self.profile_url, {'username': 'search', 'email': 'testUser@email.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.get(pk=1).username, 'testUser')
+
     #TO DO:
     def test_register_POST_email_exists(self):
         """ register does not create new user if provided email is already in use """